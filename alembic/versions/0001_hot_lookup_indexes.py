@@ -0,0 +1,51 @@
+"""Index hot lookup columns and make intent names unique per bot
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-15
+
+Written to be idempotent: databases created by create_all already have
+these objects, databases created before them get them added.
+"""
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE INDEX IF NOT EXISTS ix_bots_organization_id ON bots (organization_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_intent_bot_active ON intents (bot_id, is_active)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_training_phrases_intent_id ON training_phrases (intent_id)"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_responses_intent_id ON responses (intent_id)")
+    
+    # Intents created before the constraint may share a name within a bot;
+    # keep the oldest as is and suffix the others with their id
+    op.execute("""
+        UPDATE intents AS dup
+        SET name = left(dup.name, 240) || ' #' || dup.id
+        FROM intents AS keep
+        WHERE keep.bot_id = dup.bot_id
+          AND keep.name = dup.name
+          AND keep.id < dup.id
+    """)
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_intent_bot_name') THEN
+                ALTER TABLE intents ADD CONSTRAINT uq_intent_bot_name UNIQUE (bot_id, name);
+            END IF;
+        END $$
+    """)
+
+
+def downgrade():
+    op.execute("ALTER TABLE intents DROP CONSTRAINT IF EXISTS uq_intent_bot_name")
+    op.execute("DROP INDEX IF EXISTS ix_responses_intent_id")
+    op.execute("DROP INDEX IF EXISTS ix_training_phrases_intent_id")
+    op.execute("DROP INDEX IF EXISTS ix_intent_bot_active")
+    op.execute("DROP INDEX IF EXISTS ix_bots_organization_id")
@@ -0,0 +1,36 @@
+"""Delete an intent's training phrases and responses with it
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15
+
+delete_intent relies on these cascades. The constraints keep the names
+Postgres gives them under create_all, so re-running is harmless.
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+_CHILD_TABLES = ("training_phrases", "responses")
+
+
+def _replace_fk(table: str, on_delete: str):
+    op.execute(f"""
+        ALTER TABLE {table}
+            DROP CONSTRAINT IF EXISTS {table}_intent_id_fkey,
+            ADD CONSTRAINT {table}_intent_id_fkey
+                FOREIGN KEY (intent_id) REFERENCES intents (id) {on_delete}
+    """)
+
+
+def upgrade():
+    for table in _CHILD_TABLES:
+        _replace_fk(table, "ON DELETE CASCADE")
+
+
+def downgrade():
+    for table in _CHILD_TABLES:
+        _replace_fk(table, "")
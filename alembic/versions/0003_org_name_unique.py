@@ -0,0 +1,32 @@
+"""Make organization names unique
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-15
+
+ix_org_name is the arbiter of create_organization's
+INSERT ... ON CONFLICT (name) DO NOTHING.
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Organizations created before the index may share a name; keep the
+    # oldest as is and suffix the others with their id
+    op.execute("""
+        UPDATE organizations AS dup
+        SET name = left(dup.name, 240) || ' #' || dup.id
+        FROM organizations AS keep
+        WHERE keep.name = dup.name
+          AND keep.id < dup.id
+    """)
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_org_name ON organizations (name)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_org_name")
@@ -0,0 +1,49 @@
+"""Serve API key lookups from one unique covering index
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-15
+
+Replaces the api_key unique constraint, and the (api_key, is_active)
+index that preceded the covering one, with a single unique
+api_key INCLUDE (id, is_active) index.
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # An earlier non-unique version of the index may exist under this name
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = 'ix_org_api_key_cover' AND NOT i.indisunique
+            ) THEN
+                DROP INDEX ix_org_api_key_cover;
+            END IF;
+        END $$
+    """)
+    op.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ix_org_api_key_cover
+            ON organizations (api_key) INCLUDE (id, is_active)
+    """)
+    op.execute("ALTER TABLE organizations DROP CONSTRAINT IF EXISTS organizations_api_key_key")
+    op.execute("DROP INDEX IF EXISTS ix_org_apikey_active")
+
+
+def downgrade():
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'organizations_api_key_key') THEN
+                ALTER TABLE organizations ADD CONSTRAINT organizations_api_key_key UNIQUE (api_key);
+            END IF;
+        END $$
+    """)
+    op.execute("DROP INDEX IF EXISTS ix_org_api_key_cover")
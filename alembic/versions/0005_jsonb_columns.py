@@ -0,0 +1,59 @@
+"""Store JSON columns as NOT NULL JSONB
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-15
+
+The chat path patches conversations.context with the jsonb || operator,
+which plain json columns do not support.
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+# (table, column, empty value backfilled into nulls)
+_COLUMNS = (
+    ("bots", "settings", "{}"),
+    ("training_phrases", "entities_data", "[]"),
+    ("responses", "metadata", "{}"),
+    ("entities", "values", "[]"),
+    ("conversations", "context", "{}"),
+    ("conversations", "metadata", "{}"),
+    ("messages", "entities_extracted", "[]"),
+    ("training_jobs", "metrics", "{}"),
+    ("analytics", "top_intents", "[]"),
+)
+
+
+def _convert(table: str, column: str, target: str):
+    # Only rewrite columns still of the other type, so re-runs are no-ops
+    source = "jsonb" if target == "json" else "json"
+    op.execute(f"""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = '{table}' AND column_name = '{column}'
+                  AND data_type = '{source}'
+            ) THEN
+                ALTER TABLE {table}
+                    ALTER COLUMN "{column}" TYPE {target} USING "{column}"::{target};
+            END IF;
+        END $$
+    """)
+
+
+def upgrade():
+    for table, column, empty in _COLUMNS:
+        _convert(table, column, "jsonb")
+        op.execute(f"""UPDATE {table} SET "{column}" = '{empty}' WHERE "{column}" IS NULL""")
+        op.execute(f"""ALTER TABLE {table} ALTER COLUMN "{column}" SET NOT NULL""")
+
+
+def downgrade():
+    for table, column, _ in _COLUMNS:
+        op.execute(f"""ALTER TABLE {table} ALTER COLUMN "{column}" DROP NOT NULL""")
+        _convert(table, column, "json")
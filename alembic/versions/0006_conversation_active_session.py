@@ -0,0 +1,40 @@
+"""Allow one active conversation per session and bot
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-15
+
+uq_conversation_active_session is the ON CONFLICT arbiter of the chat
+path's conversation upsert; until it exists the API falls back to
+SELECT-then-INSERT. Restart the API after upgrading to switch over.
+"""
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Concurrent first messages could open several active conversations
+    # for one session; keep the newest and end the rest
+    op.execute("""
+        UPDATE conversations AS dup
+        SET status = 'ENDED', ended_at = coalesce(dup.ended_at, now())
+        FROM conversations AS newer
+        WHERE newer.session_id = dup.session_id
+          AND newer.bot_id = dup.bot_id
+          AND newer.status = 'ACTIVE'
+          AND dup.status = 'ACTIVE'
+          AND newer.id > dup.id
+    """)
+    op.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_conversation_active_session
+            ON conversations (session_id, bot_id)
+            WHERE status = 'ACTIVE'
+    """)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS uq_conversation_active_session")
@@ -1,55 +1,163 @@
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.models.database import get_db
-from app.models.models import Organization
-from typing import Optional
+from app.core.config import settings
+from app.models.database import get_db, redis_client
+from app.models.models import Organization, Bot
+from typing import Optional, Tuple
+import hashlib
+import json
 import logging
+import time
+import redis
 
 logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
+# API key -> organization cache lock, held while one request loads a key
+AUTH_CACHE_LOCK_TTL = 5
 
-class APIKeyAuth:
-    """API Key authentication for organizations"""
+
+def _api_key_cache_key(api_key: str) -> str:
+    """Redis key for an API key (the raw key is never stored in Redis)"""
+    return f"auth:apikey:{hashlib.sha256(api_key.encode()).hexdigest()}"
+
+
+def _query_org(api_key: str, db: Session) -> Optional[Organization]:
+    return db.query(Organization).filter(
+        Organization.api_key == api_key,
+        Organization.is_active == True
+    ).first()
+
+
+def _cached_org(api_key: str) -> Tuple[bool, Optional[Organization]]:
+    """
+    Look an API key up in the cache.
     
-    def __init__(self):
-        pass
+    Returns (hit, organization); a hit with no organization is a cached
+    unknown or revoked key.
+    """
+    try:
+        cached = redis_client.get(_api_key_cache_key(api_key))
+    except redis.RedisError as e:
+        logger.warning("Auth cache unavailable: %s", e)
+        return False, None
     
-    async def __call__(
-        self, 
-        credentials: HTTPAuthorizationCredentials = Depends(security),
-        db: Session = Depends(get_db)
-    ) -> Organization:
-        """Validate API key and return organization"""
-        
-        if not credentials:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Missing authentication credentials"
-            )
-        
-        api_key = credentials.credentials
-        
-        # Query organization by API key
-        organization = db.query(Organization).filter(
-            Organization.api_key == api_key,
-            Organization.is_active == True
-        ).first()
-        
-        if not organization:
-            logger.warning(f"Invalid API key attempted: {api_key[:10]}...")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid API key"
-            )
-        
+    if cached is None:
+        return False, None
+    data = json.loads(cached)
+    if data is None:
+        return True, None
+    return True, Organization(api_key=api_key, **data)
+
+
+def _cache_org(organization: Organization):
+    """Store the scalar fields of an organization under its API key"""
+    try:
+        redis_client.set(
+            _api_key_cache_key(organization.api_key),
+            json.dumps({
+                "id": organization.id,
+                "name": organization.name,
+                "is_active": organization.is_active
+            }),
+            ex=settings.AUTH_CACHE_TTL
+        )
+    except redis.RedisError as e:
+        logger.warning("Auth cache unavailable: %s", e)
+
+
+def _cache_unknown_key(api_key: str):
+    """Remember briefly that an API key matches no active organization"""
+    try:
+        redis_client.set(
+            _api_key_cache_key(api_key), "null", ex=settings.AUTH_CACHE_NEGATIVE_TTL
+        )
+    except redis.RedisError as e:
+        logger.warning("Auth cache unavailable: %s", e)
+
+
+def _org_from_api_key(api_key: str, db: Session) -> Optional[Organization]:
+    """
+    Resolve the active organization for an API key.
+    
+    Cache-aside through Redis so the Organization row is only read from the
+    database once per TTL. Cache hits return a detached Organization carrying
+    the scalar fields used by the endpoints. Unknown keys are cached too, for
+    AUTH_CACHE_NEGATIVE_TTL. Redis errors fall back to the DB.
+    """
+    hit, organization = _cached_org(api_key)
+    if hit:
         return organization
+    
+    lock_key = f"{_api_key_cache_key(api_key)}:lock"
+    holds_lock = False
+    try:
+        holds_lock = bool(redis_client.set(lock_key, 1, nx=True, ex=AUTH_CACHE_LOCK_TTL))
+        if not holds_lock:
+            # Another request is already loading this key; give it a moment
+            time.sleep(0.05)
+            hit, organization = _cached_org(api_key)
+            if hit:
+                return organization
+    except redis.RedisError as e:
+        logger.warning("Auth cache unavailable: %s", e)
+    
+    try:
+        organization = _query_org(api_key, db)
+        
+        if organization:
+            _cache_org(organization)
+        else:
+            _cache_unknown_key(api_key)
+    finally:
+        if holds_lock:
+            # Release now rather than after the lock TTL, so requests that
+            # miss later don't wait on a lock nobody is using
+            try:
+                redis_client.delete(lock_key)
+            except redis.RedisError as e:
+                logger.warning("Auth cache unavailable: %s", e)
+    
+    return organization
 
 
-# Create instance for dependency injection
-get_current_org = APIKeyAuth()
+def invalidate_api_key_cache(api_key: str):
+    """Drop the cached organization for an API key (call on org changes)"""
+    try:
+        redis_client.delete(_api_key_cache_key(api_key))
+    except redis.RedisError as e:
+        logger.warning("Failed to invalidate auth cache: %s", e)
+
+
+def get_current_org(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Organization:
+    """Validate API key and return organization"""
+    
+    if not credentials:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing authentication credentials"
+        )
+    
+    api_key = credentials.credentials
+    
+    # Look up organization by API key
+    organization = _org_from_api_key(api_key, db)
+    
+    if not organization:
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning("Invalid API key attempted: %s...", api_key[:10])
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key"
+        )
+    
+    return organization
 
 
 def get_organization_bots(
@@ -57,22 +165,61 @@ def get_organization_bots(
     db: Session = Depends(get_db)
 ):
     """Get all bots for the authenticated organization"""
-    from app.models.models import Bot
     return db.query(Bot).filter(Bot.organization_id == organization.id).all()
 
 
-def validate_bot_access(
+def get_org_and_bot(
     bot_id: int,
-    organization: Organization = Depends(get_current_org),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-):
-    """Validate that the organization has access to the specified bot"""
-    from app.models.models import Bot
+) -> Tuple[Organization, Bot]:
+    """
+    Authenticate the API key and load the requested bot in one round-trip.
     
-    bot = db.query(Bot).filter(
-        Bot.id == bot_id,
-        Bot.organization_id == organization.id
-    ).first()
+    With a cached organization only the bot is queried; otherwise bot and
+    organization are fetched together with a single joined SELECT.
+    """
+    if not credentials:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing authentication credentials"
+        )
+    
+    api_key = credentials.credentials
+    
+    hit, organization = _cached_org(api_key)
+    if organization:
+        bot = db.query(Bot).filter(
+            Bot.id == bot_id,
+            Bot.organization_id == organization.id
+        ).first()
+    elif hit:
+        # Cached unknown or revoked key
+        bot = None
+    else:
+        row = db.query(Bot, Organization).join(
+            Organization, Bot.organization_id == Organization.id
+        ).filter(
+            Organization.api_key == api_key,
+            Organization.is_active == True,
+            Bot.id == bot_id
+        ).first()
+        
+        if row:
+            bot, organization = row
+            _cache_org(organization)
+        else:
+            # Error path only: tell an invalid key apart from a missing bot
+            bot = None
+            organization = _org_from_api_key(api_key, db)
+    
+    if not organization:
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning("Invalid API key attempted: %s...", api_key[:10])
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key"
+        )
     
     if not bot:
         raise HTTPException(
@@ -80,32 +227,27 @@ def validate_bot_access(
             detail=f"Bot {bot_id} not found or access denied"
         )
     
-    return bot
+    return organization, bot
+
+
+def validate_bot_access(
+    org_and_bot: Tuple[Organization, Bot] = Depends(get_org_and_bot)
+) -> Bot:
+    """Validate that the organization has access to the specified bot"""
+    return org_and_bot[1]
 
 
 # Optional authentication for public endpoints
-class OptionalAPIKeyAuth:
-    """Optional API Key authentication"""
-    
-    async def __call__(
-        self, 
-        credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-        db: Session = Depends(get_db)
-    ) -> Optional[Organization]:
-        """Optionally validate API key and return organization"""
-        
-        if not credentials:
-            return None
-        
-        try:
-            api_key = credentials.credentials
-            organization = db.query(Organization).filter(
-                Organization.api_key == api_key,
-                Organization.is_active == True
-            ).first()
-            return organization
-        except Exception:
-            return None
-
-
-get_optional_org = OptionalAPIKeyAuth()
\ No newline at end of file
+def get_optional_org(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db)
+) -> Optional[Organization]:
+    """Optionally validate API key and return organization"""
+    
+    if not credentials:
+        return None
+    
+    try:
+        return _org_from_api_key(credentials.credentials, db)
+    except Exception:
+        return None
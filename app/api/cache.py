@@ -0,0 +1,240 @@
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Optional
+from app.core.config import settings
+from app.models.database import redis_client, async_redis_client
+import hashlib
+import json
+import logging
+import re
+import time
+import uuid
+import redis
+
+logger = logging.getLogger(__name__)
+
+# How long an expired entry is kept around to be served if the handler fails
+STALE_TTL = 300
+
+# Cacheable GET endpoints and their TTL in seconds
+CACHE_POLICIES = [
+    (re.compile(rf"^{settings.API_V1_STR}/bots/\d+/status$"), 10),
+    (re.compile(rf"^{settings.API_V1_STR}/bots(/\d+)?$"), 30),
+    (re.compile(rf"^{settings.API_V1_STR}/bots/\d+/intents(/\d+)?$"), 30),
+    (re.compile(rf"^{settings.API_V1_STR}/bots/\d+/intents/\d+/(training-phrases|responses)$"), 30),
+]
+
+# Writes under these paths invalidate the caller's cached GET responses
+MUTATION_PATH = re.compile(rf"^{settings.API_V1_STR}/bots(?!/\d+/(chat|conversations)(/|$))")
+
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def _tenant(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def _api_key_from_request(request: Request) -> Optional[str]:
+    authorization = request.headers.get("authorization")
+    if not authorization:
+        return None
+    scheme, _, api_key = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not api_key.strip():
+        return None
+    return api_key.strip()
+
+
+def _generation_key(tenant: str) -> str:
+    return f"cache:gen:{tenant}"
+
+
+def _ttl_for(path: str) -> Optional[int]:
+    for pattern, ttl in CACHE_POLICIES:
+        if pattern.match(path):
+            return ttl
+    return None
+
+
+def invalidate_cached_responses(api_key: str):
+    """
+    Invalidate every cached GET response for an API key.
+
+    Entries are keyed by a random generation token rather than a counter, so
+    an evicted token can never resurrect old entries.
+    """
+    try:
+        redis_client.set(_generation_key(_tenant(api_key)), uuid.uuid4().hex)
+    except redis.RedisError as e:
+        logger.warning("Failed to invalidate response cache: %s", e)
+
+
+def resource_version(resource: str) -> Optional[str]:
+    """
+    Current version token of a resource, for ETags that can be checked
+    without touching the database. Returns None if Redis is unavailable.
+    """
+    key = f"etag:v:{resource}"
+    try:
+        version = redis_client.get(key)
+        if version is None:
+            redis_client.set(key, uuid.uuid4().hex, nx=True)
+            version = redis_client.get(key)
+        return version
+    except redis.RedisError as e:
+        logger.warning("ETag version store unavailable: %s", e)
+        return None
+
+
+def bump_resource_version(*resources: str):
+    """Invalidate ETags for resources (call after the write commits)"""
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for resource in resources:
+            pipe.set(f"etag:v:{resource}", uuid.uuid4().hex)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("Failed to bump ETag version: %s", e)
+
+
+async def _generation(tenant: str) -> str:
+    key = _generation_key(tenant)
+    generation = await async_redis_client.get(key)
+    if generation is None:
+        await async_redis_client.set(key, uuid.uuid4().hex, nx=True)
+        generation = await async_redis_client.get(key)
+    return generation
+
+
+def compute_etag(*parts) -> str:
+    """Build a strong ETag from the values that identify a representation."""
+    digest = hashlib.blake2b(
+        ":".join(str(part) for part in parts).encode(), digest_size=8
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """Check an ETag against the request's If-None-Match header."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def _cached_response(entry: dict, cache_status: str) -> Response:
+    headers = {
+        "X-Cache": cache_status,
+        "Cache-Control": f"max-age={entry['ttl']}"
+    }
+    if entry.get("etag"):
+        headers["ETag"] = entry["etag"]
+    return Response(
+        content=entry["body"],
+        status_code=200,
+        media_type=entry["media_type"],
+        headers=headers
+    )
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """
+    Redis cache for read-heavy GET endpoints.
+
+    Responses are cached per API key, path and query string with a short
+    per-endpoint TTL. Any successful write to the caller's bot resources
+    rotates the caller's cache generation. Expired entries are kept for
+    STALE_TTL seconds and served if the handler errors. ETags set by the
+    handlers are stored with the entry so cache hits can answer 304.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        api_key = _api_key_from_request(request)
+        if not api_key:
+            return await call_next(request)
+
+        path = request.url.path
+
+        if request.method in MUTATING_METHODS:
+            response = await call_next(request)
+            if response.status_code < 400 and MUTATION_PATH.match(path):
+                try:
+                    await async_redis_client.set(
+                        _generation_key(_tenant(api_key)), uuid.uuid4().hex
+                    )
+                except redis.RedisError as e:
+                    logger.warning("Failed to invalidate response cache: %s", e)
+            return response
+
+        ttl = _ttl_for(path) if request.method == "GET" else None
+        if ttl is None:
+            return await call_next(request)
+
+        tenant = _tenant(api_key)
+        query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+
+        entry = None
+        try:
+            generation = await _generation(tenant)
+            cache_key = "v1:resp:" + hashlib.sha256(
+                f"{tenant}:{generation}:{path}:{query}".encode()
+            ).hexdigest()
+            cached = await async_redis_client.get(cache_key)
+            if cached is not None:
+                entry = json.loads(cached)
+        except redis.RedisError as e:
+            logger.warning("Response cache unavailable: %s", e)
+            return await call_next(request)
+
+        if entry and entry["fresh_until"] > time.time():
+            if etag_matches(request, entry.get("etag")):
+                return not_modified(entry["etag"])
+            return _cached_response(entry, "HIT")
+
+        try:
+            response = await call_next(request)
+        except Exception:
+            if entry:
+                logger.warning("Serving stale response for %s", path)
+                return _cached_response(entry, "STALE")
+            raise
+
+        if response.status_code >= 500 and entry:
+            logger.warning("Serving stale response for %s", path)
+            return _cached_response(entry, "STALE")
+
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        media_type = response.headers.get("content-type", "application/json")
+
+        try:
+            await async_redis_client.set(
+                cache_key,
+                json.dumps({
+                    "body": body.decode(),
+                    "media_type": media_type,
+                    "etag": response.headers.get("etag"),
+                    "ttl": ttl,
+                    "fresh_until": time.time() + ttl
+                }),
+                ex=ttl + STALE_TTL
+            )
+        except redis.RedisError as e:
+            logger.warning("Response cache unavailable: %s", e)
+
+        # Copy the raw header list; a dict would collapse repeated headers
+        # such as Set-Cookie
+        miss = Response(content=body, status_code=response.status_code)
+        miss.raw_headers = list(response.raw_headers)
+        miss.headers["X-Cache"] = "MISS"
+        miss.headers["Cache-Control"] = f"max-age={ttl}"
+        return miss
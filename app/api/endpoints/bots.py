@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
+from sqlalchemy import exists, func, insert, select, update
 from sqlalchemy.orm import Session
 from typing import List
+from datetime import datetime, timedelta, timezone
 from app.models.database import get_db
-from app.models.models import Organization, Bot, BotStatus
+from app.models.models import Organization, Bot, BotStatus, Intent, TrainingPhrase, TrainingJob
 from app.api.schemas import (
-    BotCreate, BotUpdate, Bot as BotSchema, SuccessResponse,
+    BotCreate, BotUpdate, Bot as BotSchema, BotListItem, SuccessResponse,
     TrainingRequest, TrainingResponse
 )
 from app.api.auth import get_current_org, validate_bot_access
-from app.services.chatbot_service import ChatbotService
+from app.api.cache import compute_etag, etag_matches, not_modified
+from app.core.config import settings
+from app.services.chatbot_service import invalidate_bot_config, run_training_job
+from app.nlp.intent_classifier import IntentClassifier
 import uuid
 import logging
 
@@ -16,21 +21,30 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-
 @router.get(
     "/bots",
-    response_model=List[BotSchema],
+    response_model=List[BotListItem],
     summary="List bots",
     description="Get all bots for the authenticated organization"
 )
-async def list_bots(
+def list_bots(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     organization: Organization = Depends(get_current_org)
 ):
     """
     List all bots belonging to the authenticated organization.
     """
-    bots = db.query(Bot).filter(Bot.organization_id == organization.id).all()
+    bots = db.query(
+        Bot.id, Bot.name, Bot.description, Bot.status, Bot.language, Bot.updated_at
+    ).filter(Bot.organization_id == organization.id).all()
+    
+    etag = compute_etag(*bots)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    response.headers["ETag"] = etag
     return bots
 
 
@@ -41,7 +55,7 @@ async def list_bots(
     summary="Create bot",
     description="Create a new chatbot"
 )
-async def create_bot(
+def create_bot(
     bot_data: BotCreate,
     db: Session = Depends(get_db),
     organization: Organization = Depends(get_current_org)
@@ -57,27 +71,28 @@ async def create_bot(
                 detail="Cannot create bot for different organization"
             )
         
-        # Create bot
-        bot = Bot(
-            name=bot_data.name,
-            description=bot_data.description,
-            organization_id=organization.id,
-            default_response=bot_data.default_response,
-            confidence_threshold=bot_data.confidence_threshold,
-            language=bot_data.language,
-            settings=bot_data.settings or {},
-            status=BotStatus.INACTIVE  # Start as inactive until trained
-        )
+        # Create bot, reading server defaults back with RETURNING
+        bots = Bot.__table__
+        bot = db.execute(
+            insert(bots).values(
+                name=bot_data.name,
+                description=bot_data.description,
+                organization_id=organization.id,
+                default_response=bot_data.default_response,
+                confidence_threshold=bot_data.confidence_threshold,
+                language=bot_data.language,
+                settings=bot_data.settings or {},
+                status=BotStatus.INACTIVE  # Start as inactive until trained
+            ).returning(*bots.c)
+        ).one()
         
-        db.add(bot)
         db.commit()
-        db.refresh(bot)
         
-        logger.info(f"Created bot {bot.id} for organization {organization.id}")
+        logger.info("Created bot %s for organization %s", bot.id, organization.id)
         return bot
         
     except Exception as e:
-        logger.error(f"Error creating bot: {e}")
+        logger.error("Error creating bot: %s", e)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -91,15 +106,21 @@ async def create_bot(
     summary="Get bot",
     description="Get a specific bot by ID"
 )
-async def get_bot(
+def get_bot(
     bot_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """
     Get details of a specific bot.
     """
+    etag = compute_etag(bot.id, bot.updated_at or bot.created_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    response.headers["ETag"] = etag
     return bot
 
 
@@ -109,11 +130,10 @@ async def get_bot(
     summary="Update bot",
     description="Update a bot's configuration"
 )
-async def update_bot(
+def update_bot(
     bot_id: int,
     bot_data: BotUpdate,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """
@@ -121,19 +141,24 @@ async def update_bot(
     """
     try:
         # Update fields if provided
-        update_data = bot_data.dict(exclude_unset=True)
+        update_data = bot_data.model_dump(exclude_unset=True)
+        
+        # settings is NOT NULL; an explicit null clears it
+        if "settings" in update_data and update_data["settings"] is None:
+            update_data["settings"] = {}
         
         for field, value in update_data.items():
             setattr(bot, field, value)
         
         db.commit()
+        invalidate_bot_config(bot_id)
         db.refresh(bot)
         
-        logger.info(f"Updated bot {bot_id}")
+        logger.info("Updated bot %s", bot_id)
         return bot
         
     except Exception as e:
-        logger.error(f"Error updating bot {bot_id}: {e}")
+        logger.error("Error updating bot %s: %s", bot_id, e)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -147,26 +172,41 @@ async def update_bot(
     summary="Delete bot",
     description="Delete a bot (soft delete - marks as inactive)"
 )
-async def delete_bot(
+def delete_bot(
     bot_id: int,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
-    bot: Bot = Depends(validate_bot_access)
+    organization: Organization = Depends(get_current_org)
 ):
     """
     Delete a bot (soft delete by marking as inactive).
     """
     try:
-        bot.status = BotStatus.INACTIVE
+        # Ownership check and soft delete in one statement
+        deleted = db.execute(
+            update(Bot).where(
+                Bot.id == bot_id,
+                Bot.organization_id == organization.id
+            ).values(status=BotStatus.INACTIVE).returning(Bot.id)
+        ).first()
+        
+        if not deleted:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Bot {bot_id} not found or access denied"
+            )
+        
         db.commit()
+        invalidate_bot_config(bot_id)
         
-        logger.info(f"Deleted bot {bot_id}")
+        logger.info("Deleted bot %s", bot_id)
         return SuccessResponse(
             message=f"Bot {bot_id} deleted successfully"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error deleting bot {bot_id}: {e}")
+        logger.error("Error deleting bot %s: %s", bot_id, e)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -174,91 +214,176 @@ async def delete_bot(
         )
 
 
+def _training_in_progress(db: Session, bot_id: int) -> bool:
+    """
+    Whether the bot's latest training job is still live.
+    
+    Jobs run as in-process background tasks, so a worker that restarts or is
+    killed mid-job never records the outcome. A pending/running job older
+    than TRAINING_JOB_TIMEOUT is marked failed here instead of blocking
+    retraining forever.
+    """
+    job = db.query(TrainingJob).filter(
+        TrainingJob.bot_id == bot_id
+    ).order_by(TrainingJob.id.desc()).first()
+    
+    if not job or job.status not in ("pending", "running"):
+        return False
+        
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.TRAINING_JOB_TIMEOUT)
+    if job.started_at and job.started_at > stale_before:
+        return True
+        
+    job.status = "failed"
+    job.error_message = "Abandoned: no result within TRAINING_JOB_TIMEOUT"
+    job.completed_at = func.now()
+    logger.warning("Training job %s for bot %s abandoned; allowing retrain", job.id, bot_id)
+    return False
+
+
 @router.post(
     "/bots/{bot_id}/train",
     response_model=TrainingResponse,
+    status_code=status.HTTP_202_ACCEPTED,
     summary="Train bot",
-    description="Train or retrain the bot with current training data"
+    description="Queue training of the bot with current training data"
 )
-async def train_bot(
+def train_bot(
     bot_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """
-    Train the bot with current intents and training phrases.
+    Queue training of the bot with current intents and training phrases.
+    
+    Training runs after the response is sent; poll the bot status or the
+    returned training job for the outcome.
     """
     try:
-        # Set bot status to training
+        # Lock the bot row so concurrent train requests serialize on the
+        # status check below instead of both claiming the bot
+        bot = db.query(Bot).filter(
+            Bot.id == bot_id
+        ).populate_existing().with_for_update().one()
+        
+        if bot.status == BotStatus.TRAINING and _training_in_progress(db, bot_id):
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Bot {bot_id} is already training"
+            )
+        
+        has_training_data = db.scalar(select(exists().where(
+            TrainingPhrase.intent_id == Intent.id,
+            Intent.bot_id == bot_id,
+            Intent.is_active == True
+        )))
+        
+        if not has_training_data:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No training data available"
+            )
+        
+        # Set bot status to training and record the job
         bot.status = BotStatus.TRAINING
+        job = TrainingJob(bot_id=bot_id, status="pending")
+        db.add(job)
+        db.flush()
+        training_id = job.id
         db.commit()
+        invalidate_bot_config(bot_id)
         
-        # Initialize chatbot service and train
-        chatbot_service = ChatbotService(bot_id, db)
-        metrics = chatbot_service.train_bot()
+        background_tasks.add_task(run_training_job, bot_id, training_id)
         
+        logger.info("Queued training job %s for bot %s", training_id, bot_id)
         return TrainingResponse(
-            status="completed",
-            metrics=metrics,
-            message="Bot training completed successfully"
+            status="queued",
+            training_id=training_id,
+            message="Bot training queued"
         )
         
-    except ValueError as e:
-        # Reset status on training error
-        bot.status = BotStatus.INACTIVE
-        db.commit()
-        
-        logger.error(f"Training error for bot {bot_id}: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
+    except HTTPException:
+        raise
     except Exception as e:
-        # Reset status on training error
-        bot.status = BotStatus.INACTIVE
-        db.commit()
-        
-        logger.error(f"Error training bot {bot_id}: {e}")
+        logger.error("Error queueing training for bot %s: %s", bot_id, e)
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error training bot"
         )
 
 
+@router.get(
+    "/bots/{bot_id}/train/{training_id}",
+    response_model=TrainingResponse,
+    summary="Get training job",
+    description="Get the outcome of a queued training job"
+)
+def get_training_job(
+    bot_id: int,
+    training_id: int,
+    db: Session = Depends(get_db),
+    bot: Bot = Depends(validate_bot_access)
+):
+    """
+    Get the status and metrics of a training job.
+    """
+    job = db.query(TrainingJob).filter(
+        TrainingJob.id == training_id,
+        TrainingJob.bot_id == bot_id
+    ).first()
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Training job not found"
+        )
+    
+    return TrainingResponse(
+        status=job.status,
+        training_id=job.id,
+        metrics=job.metrics or {},
+        message=job.error_message or f"Training job {job.status}"
+    )
+
+
 @router.get(
     "/bots/{bot_id}/status",
     response_model=dict,
     summary="Get bot status",
     description="Get the current status and health of the bot"
 )
-async def get_bot_status(
+def get_bot_status(
     bot_id: int,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """
     Get the current status and health information of the bot.
     """
     try:
-        # Count intents and training phrases
-        from app.models.models import Intent, TrainingPhrase
-        
-        intent_count = db.query(Intent).filter(
+        # Count intents and training phrases in a single round-trip
+        intent_count = select(func.count()).select_from(Intent).where(
             Intent.bot_id == bot_id,
             Intent.is_active == True
-        ).count()
+        ).scalar_subquery()
         
-        training_phrase_count = db.query(TrainingPhrase).join(Intent).filter(
+        training_phrase_count = select(func.count()).select_from(TrainingPhrase).join(
+            Intent, TrainingPhrase.intent_id == Intent.id
+        ).where(
             Intent.bot_id == bot_id,
             Intent.is_active == True
-        ).count()
+        ).scalar_subquery()
+        
+        intent_count, training_phrase_count = db.execute(
+            select(intent_count, training_phrase_count)
+        ).one()
         
         # Check if model exists
-        from app.nlp.intent_classifier import IntentClassifier
-        classifier = IntentClassifier(bot_id)
-        model_exists = classifier.load_model()
+        model_exists = IntentClassifier.model_exists(bot_id)
         
         return {
             "bot_id": bot_id,
@@ -269,11 +394,11 @@ async def get_bot_status(
             "model_trained": model_exists,
             "confidence_threshold": bot.confidence_threshold,
             "language": bot.language,
-            "last_updated": bot.updated_at.isoformat() if bot.updated_at else None
+            "last_updated": bot.updated_at
         }
         
     except Exception as e:
-        logger.error(f"Error getting bot status for {bot_id}: {e}")
+        logger.error("Error getting bot status for %s: %s", bot_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error retrieving bot status"
@@ -2,9 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from app.models.database import get_db
-from app.models.models import Organization, Bot
+from app.models.models import Bot
 from app.api.schemas import ChatRequest, ChatResponse, ConversationHistory, SuccessResponse
-from app.api.auth import get_current_org, validate_bot_access
+from app.api.auth import validate_bot_access
 from app.services.chatbot_service import ChatbotService
 import logging
 
@@ -19,11 +19,10 @@ router = APIRouter()
     summary="Send message to chatbot",
     description="Process a user message and get bot response"
 )
-async def chat_with_bot(
+def chat_with_bot(
     bot_id: int,
     request: ChatRequest,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """
@@ -37,7 +36,7 @@ async def chat_with_bot(
     """
     try:
         # Initialize chatbot service
-        chatbot_service = ChatbotService(bot_id, db)
+        chatbot_service = ChatbotService(bot, db)
         
         # Process the message
         response = chatbot_service.process_message(
@@ -50,7 +49,7 @@ async def chat_with_bot(
         return response.to_dict()
         
     except Exception as e:
-        logger.error(f"Error in chat endpoint for bot {bot_id}: {e}")
+        logger.error("Error in chat endpoint for bot %s: %s", bot_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error processing chat request"
@@ -63,24 +62,23 @@ async def chat_with_bot(
     summary="Get conversation history",
     description="Retrieve the message history for a conversation session"
 )
-async def get_conversation_history(
+def get_conversation_history(
     bot_id: int,
     session_id: str,
     limit: int = 50,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """
     Get the conversation history for a specific session.
     """
     try:
-        chatbot_service = ChatbotService(bot_id, db)
+        chatbot_service = ChatbotService(bot, db)
         history = chatbot_service.get_conversation_history(session_id, limit)
         return history
         
     except Exception as e:
-        logger.error(f"Error getting conversation history for bot {bot_id}, session {session_id}: {e}")
+        logger.error("Error getting conversation history for bot %s, session %s: %s", bot_id, session_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error retrieving conversation history"
@@ -93,18 +91,17 @@ async def get_conversation_history(
     summary="End conversation",
     description="Mark a conversation as ended"
 )
-async def end_conversation(
+def end_conversation(
     bot_id: int,
     session_id: str,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """
     End an active conversation session.
     """
     try:
-        chatbot_service = ChatbotService(bot_id, db)
+        chatbot_service = ChatbotService(bot, db)
         chatbot_service.end_conversation(session_id)
         
         return SuccessResponse(
@@ -112,7 +109,7 @@ async def end_conversation(
         )
         
     except Exception as e:
-        logger.error(f"Error ending conversation for bot {bot_id}, session {session_id}: {e}")
+        logger.error("Error ending conversation for bot %s, session %s: %s", bot_id, session_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error ending conversation"
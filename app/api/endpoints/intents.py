@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import Response as HTTPResponse
+from sqlalchemy import delete, exists, insert, select, literal, Text, String, Integer
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List
 from app.models.database import get_db
-from app.models.models import Organization, Bot, Intent, TrainingPhrase, Response
+from app.models.models import Bot, Intent, TrainingPhrase, Response
 from app.api.schemas import (
-    IntentCreate, IntentUpdate, Intent as IntentSchema,
+    IntentCreate, IntentUpdate, Intent as IntentSchema, IntentListItem,
     TrainingPhraseCreate, TrainingPhraseUpdate, TrainingPhrase as TrainingPhraseSchema,
-    ResponseCreate, ResponseUpdate, Response as ResponseSchema,
-    SuccessResponse, BulkIntentCreate
+    TrainingPhraseListItem,
+    ResponseCreate, ResponseUpdate, Response as ResponseSchema, ResponseListItem,
+    SuccessResponse, BulkIntentCreate, BulkTrainingPhraseCreate, BulkResponseCreate
 )
-from app.api.auth import get_current_org, validate_bot_access
+from app.api.auth import validate_bot_access
+from app.api.cache import compute_etag, etag_matches, not_modified
+from app.services.chatbot_service import invalidate_bot_config
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,21 +24,60 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _intent_name_exists(db: Session, bot_id: int, name: str, exclude_id: int = None) -> bool:
+    """Check for an intent name in a bot without loading the row"""
+    condition = exists().where(Intent.bot_id == bot_id, Intent.name == name)
+    if exclude_id is not None:
+        condition = condition.where(Intent.id != exclude_id)
+    return db.scalar(select(condition))
+
+
+def _intent_name_conflict(name: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Intent '{name}' already exists for this bot"
+    )
+
+
+def _ensure_intent(db: Session, bot_id: int, intent_id: int):
+    """Raise 404 unless the intent exists and belongs to the bot"""
+    intent = db.query(Intent.id).filter(
+        Intent.id == intent_id,
+        Intent.bot_id == bot_id
+    ).first()
+    
+    if not intent:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Intent not found"
+        )
+
+
 # Intent endpoints
 @router.get(
     "/bots/{bot_id}/intents",
-    response_model=List[IntentSchema],
+    response_model=List[IntentListItem],
     summary="List intents",
     description="Get all intents for a bot"
 )
-async def list_intents(
+def list_intents(
     bot_id: int,
+    request: Request,
+    http_response: HTTPResponse,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """List all intents for the specified bot."""
-    intents = db.query(Intent).filter(Intent.bot_id == bot_id).all()
+    intents = db.query(
+        Intent.id, Intent.name, Intent.description, Intent.is_active, Intent.priority,
+        Intent.updated_at
+    ).filter(Intent.bot_id == bot_id).all()
+    
+    etag = compute_etag(*intents)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    http_response.headers["ETag"] = etag
     return intents
 
 
@@ -42,11 +88,10 @@ async def list_intents(
     summary="Create intent",
     description="Create a new intent for the bot"
 )
-async def create_intent(
+def create_intent(
     bot_id: int,
     intent_data: IntentCreate,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """Create a new intent for the bot."""
@@ -59,39 +104,121 @@ async def create_intent(
             )
         
         # Check if intent name already exists for this bot
-        existing_intent = db.query(Intent).filter(
-            Intent.name == intent_data.name,
-            Intent.bot_id == bot_id
-        ).first()
+        if _intent_name_exists(db, bot_id, intent_data.name):
+            raise _intent_name_conflict(intent_data.name)
+        
+        intents = Intent.__table__
+        try:
+            intent = db.execute(
+                insert(intents).values(
+                    name=intent_data.name,
+                    description=intent_data.description,
+                    bot_id=bot_id,
+                    priority=intent_data.priority
+                ).returning(*intents.c)
+            ).one()
+            db.commit()
+        except IntegrityError:
+            # Lost a race with a concurrent create of the same name
+            db.rollback()
+            raise _intent_name_conflict(intent_data.name)
+        
+        logger.info("Created intent %s for bot %s", intent.id, bot_id)
+        return intent
         
-        if existing_intent:
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error creating intent: %s", e)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error creating intent"
+        )
+
+
+@router.post(
+    "/bots/{bot_id}/intents/bulk",
+    response_model=List[IntentSchema],
+    status_code=status.HTTP_201_CREATED,
+    summary="Bulk create intents",
+    description="Create many intents, with their training phrases, in one transaction"
+)
+def bulk_create_intents(
+    bot_id: int,
+    bulk_data: BulkIntentCreate,
+    db: Session = Depends(get_db),
+    bot: Bot = Depends(validate_bot_access)
+):
+    """Create intents and their training phrases with one executemany per table."""
+    try:
+        # Verify bot_id matches
+        if bulk_data.bot_id != bot_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Intent '{intent_data.name}' already exists for this bot"
+                detail="Bot ID mismatch"
             )
         
-        intent = Intent(
-            name=intent_data.name,
-            description=intent_data.description,
-            bot_id=bot_id,
-            priority=intent_data.priority
-        )
+        names = [item.name for item in bulk_data.intents]
+        if len(set(names)) != len(names):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Duplicate intent names in request"
+            )
+        
+        # Check all names against existing intents in one query
+        existing_names = [
+            name for (name,) in db.query(Intent.name).filter(
+                Intent.bot_id == bot_id,
+                Intent.name.in_(names)
+            ).all()
+        ]
+        
+        if existing_names:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Intents already exist for this bot: {', '.join(existing_names)}"
+            )
+        
+        intents_table = Intent.__table__
+        intents = db.execute(
+            insert(intents_table).returning(*intents_table.c, sort_by_parameter_order=True),
+            [
+                {
+                    "name": item.name,
+                    "description": item.description,
+                    "bot_id": bot_id,
+                    "priority": item.priority
+                }
+                for item in bulk_data.intents
+            ]
+        ).all()
+        
+        training_phrases = [
+            {"text": text, "intent_id": intent.id, "entities_data": []}
+            for intent, item in zip(intents, bulk_data.intents)
+            for text in item.training_phrases
+        ]
+        
+        if training_phrases:
+            db.execute(insert(TrainingPhrase.__table__), training_phrases)
         
-        db.add(intent)
         db.commit()
-        db.refresh(intent)
         
-        logger.info(f"Created intent {intent.id} for bot {bot_id}")
-        return intent
+        logger.info(
+            "Created %s intents and %s training phrases for bot %s",
+            len(intents), len(training_phrases), bot_id
+        )
+        return intents
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error creating intent: {e}")
+        logger.error("Error bulk creating intents: %s", e)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error creating intent"
+            detail="Error creating intents"
         )
 
 
@@ -101,11 +228,12 @@ async def create_intent(
     summary="Get intent",
     description="Get a specific intent by ID"
 )
-async def get_intent(
+def get_intent(
     bot_id: int,
     intent_id: int,
+    request: Request,
+    http_response: HTTPResponse,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """Get a specific intent."""
@@ -120,6 +248,11 @@ async def get_intent(
             detail="Intent not found"
         )
     
+    etag = compute_etag(intent.id, intent.updated_at or intent.created_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    http_response.headers["ETag"] = etag
     return intent
 
 
@@ -129,12 +262,11 @@ async def get_intent(
     summary="Update intent",
     description="Update an intent"
 )
-async def update_intent(
+def update_intent(
     bot_id: int,
     intent_id: int,
     intent_data: IntentUpdate,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """Update an intent."""
@@ -152,33 +284,29 @@ async def update_intent(
         
         # Check for name conflicts if name is being updated
         if intent_data.name and intent_data.name != intent.name:
-            existing_intent = db.query(Intent).filter(
-                Intent.name == intent_data.name,
-                Intent.bot_id == bot_id,
-                Intent.id != intent_id
-            ).first()
-            
-            if existing_intent:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Intent '{intent_data.name}' already exists for this bot"
-                )
+            if _intent_name_exists(db, bot_id, intent_data.name, exclude_id=intent_id):
+                raise _intent_name_conflict(intent_data.name)
         
         # Update fields
-        update_data = intent_data.dict(exclude_unset=True)
+        update_data = intent_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(intent, field, value)
         
-        db.commit()
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise _intent_name_conflict(intent_data.name)
         db.refresh(intent)
+        invalidate_bot_config(bot_id)
         
-        logger.info(f"Updated intent {intent_id}")
+        logger.info("Updated intent %s", intent_id)
         return intent
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error updating intent {intent_id}: {e}")
+        logger.error("Error updating intent %s: %s", intent_id, e)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -192,31 +320,32 @@ async def update_intent(
     summary="Delete intent",
     description="Delete an intent and all its training phrases and responses"
 )
-async def delete_intent(
+def delete_intent(
     bot_id: int,
     intent_id: int,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """Delete an intent and all its associated data."""
     try:
-        intent = db.query(Intent).filter(
-            Intent.id == intent_id,
-            Intent.bot_id == bot_id
+        # Training phrases and responses go with it via ON DELETE CASCADE
+        deleted = db.execute(
+            delete(Intent).where(
+                Intent.id == intent_id,
+                Intent.bot_id == bot_id
+            ).returning(Intent.id)
         ).first()
         
-        if not intent:
+        if not deleted:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Intent not found"
             )
         
-        # Delete associated training phrases and responses (cascade)
-        db.delete(intent)
         db.commit()
+        invalidate_bot_config(bot_id)
         
-        logger.info(f"Deleted intent {intent_id}")
+        logger.info("Deleted intent %s", intent_id)
         return SuccessResponse(
             message=f"Intent {intent_id} deleted successfully"
         )
@@ -224,7 +353,7 @@ async def delete_intent(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting intent {intent_id}: {e}")
+        logger.error("Error deleting intent %s: %s", intent_id, e)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -235,34 +364,36 @@ async def delete_intent(
 # Training Phrases endpoints
 @router.get(
     "/bots/{bot_id}/intents/{intent_id}/training-phrases",
-    response_model=List[TrainingPhraseSchema],
+    response_model=List[TrainingPhraseListItem],
     summary="List training phrases",
     description="Get all training phrases for an intent"
 )
-async def list_training_phrases(
+def list_training_phrases(
     bot_id: int,
     intent_id: int,
+    request: Request,
+    http_response: HTTPResponse,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """List all training phrases for an intent."""
-    # Verify intent exists and belongs to bot
-    intent = db.query(Intent).filter(
+    # Ownership is enforced by the join; only an empty result needs a
+    # second look to tell an empty intent from a missing one
+    training_phrases = db.query(
+        TrainingPhrase.id, TrainingPhrase.text, TrainingPhrase.entities_data
+    ).join(Intent, TrainingPhrase.intent_id == Intent.id).filter(
         Intent.id == intent_id,
         Intent.bot_id == bot_id
-    ).first()
+    ).all()
     
-    if not intent:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Intent not found"
-        )
+    if not training_phrases:
+        _ensure_intent(db, bot_id, intent_id)
     
-    training_phrases = db.query(TrainingPhrase).filter(
-        TrainingPhrase.intent_id == intent_id
-    ).all()
+    etag = compute_etag(*training_phrases)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
+    http_response.headers["ETag"] = etag
     return training_phrases
 
 
@@ -273,28 +404,15 @@ async def list_training_phrases(
     summary="Create training phrase",
     description="Add a new training phrase to an intent"
 )
-async def create_training_phrase(
+def create_training_phrase(
     bot_id: int,
     intent_id: int,
     phrase_data: TrainingPhraseCreate,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """Create a new training phrase for an intent."""
     try:
-        # Verify intent exists and belongs to bot
-        intent = db.query(Intent).filter(
-            Intent.id == intent_id,
-            Intent.bot_id == bot_id
-        ).first()
-        
-        if not intent:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Intent not found"
-            )
-        
         # Verify intent_id matches
         if phrase_data.intent_id != intent_id:
             raise HTTPException(
@@ -302,23 +420,37 @@ async def create_training_phrase(
                 detail="Intent ID mismatch"
             )
         
-        training_phrase = TrainingPhrase(
-            text=phrase_data.text,
-            intent_id=intent_id,
-            entities_data=phrase_data.entities_data
-        )
+        # Insert only if the intent belongs to the bot
+        training_phrases = TrainingPhrase.__table__
+        training_phrase = db.execute(
+            insert(training_phrases).from_select(
+                ["text", "intent_id", "entities_data"],
+                select(
+                    literal(phrase_data.text, Text),
+                    Intent.id,
+                    literal(phrase_data.entities_data or [], JSONB)
+                ).where(
+                    Intent.id == intent_id,
+                    Intent.bot_id == bot_id
+                )
+            ).returning(*training_phrases.c)
+        ).first()
+        
+        if not training_phrase:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Intent not found"
+            )
         
-        db.add(training_phrase)
         db.commit()
-        db.refresh(training_phrase)
         
-        logger.info(f"Created training phrase {training_phrase.id} for intent {intent_id}")
+        logger.info("Created training phrase %s for intent %s", training_phrase.id, intent_id)
         return training_phrase
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error creating training phrase: {e}")
+        logger.error("Error creating training phrase: %s", e)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -326,25 +458,74 @@ async def create_training_phrase(
         )
 
 
+@router.post(
+    "/bots/{bot_id}/intents/{intent_id}/training-phrases/bulk",
+    response_model=List[TrainingPhraseSchema],
+    status_code=status.HTTP_201_CREATED,
+    summary="Bulk create training phrases",
+    description="Add many training phrases to an intent in one transaction"
+)
+def bulk_create_training_phrases(
+    bot_id: int,
+    intent_id: int,
+    bulk_data: BulkTrainingPhraseCreate,
+    db: Session = Depends(get_db),
+    bot: Bot = Depends(validate_bot_access)
+):
+    """Create training phrases for an intent with a single executemany."""
+    try:
+        _ensure_intent(db, bot_id, intent_id)
+        
+        training_phrases_table = TrainingPhrase.__table__
+        training_phrases = db.execute(
+            insert(training_phrases_table).returning(
+                *training_phrases_table.c, sort_by_parameter_order=True
+            ),
+            [
+                {
+                    "text": phrase.text,
+                    "intent_id": intent_id,
+                    "entities_data": phrase.entities_data or []
+                }
+                for phrase in bulk_data.training_phrases
+            ]
+        ).all()
+        
+        db.commit()
+        
+        logger.info("Created %s training phrases for intent %s", len(training_phrases), intent_id)
+        return training_phrases
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error bulk creating training phrases: %s", e)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error creating training phrases"
+        )
+
+
 @router.delete(
     "/bots/{bot_id}/intents/{intent_id}/training-phrases/{phrase_id}",
     response_model=SuccessResponse,
     summary="Delete training phrase",
     description="Delete a training phrase"
 )
-async def delete_training_phrase(
+def delete_training_phrase(
     bot_id: int,
     intent_id: int,
     phrase_id: int,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """Delete a training phrase."""
     try:
-        training_phrase = db.query(TrainingPhrase).filter(
+        training_phrase = db.query(TrainingPhrase).join(Intent).filter(
             TrainingPhrase.id == phrase_id,
-            TrainingPhrase.intent_id == intent_id
+            TrainingPhrase.intent_id == intent_id,
+            Intent.bot_id == bot_id
         ).first()
         
         if not training_phrase:
@@ -356,7 +537,7 @@ async def delete_training_phrase(
         db.delete(training_phrase)
         db.commit()
         
-        logger.info(f"Deleted training phrase {phrase_id}")
+        logger.info("Deleted training phrase %s", phrase_id)
         return SuccessResponse(
             message=f"Training phrase {phrase_id} deleted successfully"
         )
@@ -364,7 +545,7 @@ async def delete_training_phrase(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting training phrase {phrase_id}: {e}")
+        logger.error("Error deleting training phrase %s: %s", phrase_id, e)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -375,34 +556,37 @@ async def delete_training_phrase(
 # Response endpoints
 @router.get(
     "/bots/{bot_id}/intents/{intent_id}/responses",
-    response_model=List[ResponseSchema],
+    response_model=List[ResponseListItem],
     summary="List responses",
     description="Get all responses for an intent"
 )
-async def list_responses(
+def list_responses(
     bot_id: int,
     intent_id: int,
+    request: Request,
+    http_response: HTTPResponse,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """List all responses for an intent."""
-    # Verify intent exists and belongs to bot
-    intent = db.query(Intent).filter(
+    # Ownership is enforced by the join; only an empty result needs a
+    # second look to tell an empty intent from a missing one
+    responses = db.query(
+        Response.id, Response.text, Response.response_type,
+        Response.meta.label("metadata"), Response.priority
+    ).join(Intent, Response.intent_id == Intent.id).filter(
         Intent.id == intent_id,
         Intent.bot_id == bot_id
-    ).first()
+    ).all()
     
-    if not intent:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Intent not found"
-        )
+    if not responses:
+        _ensure_intent(db, bot_id, intent_id)
     
-    responses = db.query(Response).filter(
-        Response.intent_id == intent_id
-    ).all()
+    etag = compute_etag(*responses)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
+    http_response.headers["ETag"] = etag
     return responses
 
 
@@ -413,28 +597,15 @@ async def list_responses(
     summary="Create response",
     description="Add a new response to an intent"
 )
-async def create_response(
+def create_response(
     bot_id: int,
     intent_id: int,
     response_data: ResponseCreate,
     db: Session = Depends(get_db),
-    organization: Organization = Depends(get_current_org),
     bot: Bot = Depends(validate_bot_access)
 ):
     """Create a new response for an intent."""
     try:
-        # Verify intent exists and belongs to bot
-        intent = db.query(Intent).filter(
-            Intent.id == intent_id,
-            Intent.bot_id == bot_id
-        ).first()
-        
-        if not intent:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Intent not found"
-            )
-        
         # Verify intent_id matches
         if response_data.intent_id != intent_id:
             raise HTTPException(
@@ -442,27 +613,94 @@ async def create_response(
                 detail="Intent ID mismatch"
             )
         
-        response = Response(
-            text=response_data.text,
-            intent_id=intent_id,
-            response_type=response_data.response_type,
-            metadata=response_data.metadata,
-            priority=response_data.priority
-        )
+        # Insert only if the intent belongs to the bot
+        responses = Response.__table__
+        response = db.execute(
+            insert(responses).from_select(
+                ["text", "intent_id", "response_type", "metadata", "priority"],
+                select(
+                    literal(response_data.text, Text),
+                    Intent.id,
+                    literal(response_data.response_type, String),
+                    literal(response_data.metadata or {}, JSONB),
+                    literal(response_data.priority, Integer)
+                ).where(
+                    Intent.id == intent_id,
+                    Intent.bot_id == bot_id
+                )
+            ).returning(*responses.c)
+        ).first()
+        
+        if not response:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Intent not found"
+            )
         
-        db.add(response)
         db.commit()
-        db.refresh(response)
+        invalidate_bot_config(bot_id)
         
-        logger.info(f"Created response {response.id} for intent {intent_id}")
+        logger.info("Created response %s for intent %s", response.id, intent_id)
         return response
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error creating response: {e}")
+        logger.error("Error creating response: %s", e)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error creating response"
+        )
+
+
+@router.post(
+    "/bots/{bot_id}/intents/{intent_id}/responses/bulk",
+    response_model=List[ResponseSchema],
+    status_code=status.HTTP_201_CREATED,
+    summary="Bulk create responses",
+    description="Add many responses to an intent in one transaction"
+)
+def bulk_create_responses(
+    bot_id: int,
+    intent_id: int,
+    bulk_data: BulkResponseCreate,
+    db: Session = Depends(get_db),
+    bot: Bot = Depends(validate_bot_access)
+):
+    """Create responses for an intent with a single executemany."""
+    try:
+        _ensure_intent(db, bot_id, intent_id)
+        
+        responses_table = Response.__table__
+        responses = db.execute(
+            insert(responses_table).returning(
+                *responses_table.c, sort_by_parameter_order=True
+            ),
+            [
+                {
+                    "text": item.text,
+                    "intent_id": intent_id,
+                    "response_type": item.response_type,
+                    "metadata": item.metadata or {},
+                    "priority": item.priority
+                }
+                for item in bulk_data.responses
+            ]
+        ).all()
+        
+        db.commit()
+        invalidate_bot_config(bot_id)
+        
+        logger.info("Created %s responses for intent %s", len(responses), intent_id)
+        return responses
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error bulk creating responses: %s", e)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error creating responses"
         )
\ No newline at end of file
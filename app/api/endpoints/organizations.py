@@ -1,13 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import exists, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Union
 from app.models.database import get_db
-from app.models.models import Organization
+from app.models.models import Organization, Bot, BotStatus
 from app.api.schemas import (
     OrganizationCreate, OrganizationUpdate, Organization as OrganizationSchema,
-    SuccessResponse
+    OrganizationPage, OrganizationWithBots, SuccessResponse
+)
+from app.api.auth import invalidate_api_key_cache
+from app.api.cache import (
+    invalidate_cached_responses, compute_etag, etag_matches, not_modified,
+    resource_version, bump_resource_version
 )
-import uuid
 import secrets
 import logging
 
@@ -15,12 +24,22 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_ORG_LIST_ADAPTER = TypeAdapter(List[OrganizationSchema])
+
 
 def generate_api_key() -> str:
     """Generate a secure API key"""
     return f"cb_{secrets.token_urlsafe(32)}"
 
 
+def org_name_exists(db: Session, name: str, exclude_id: int = None) -> bool:
+    """Check whether an organization name is taken, via SELECT EXISTS"""
+    condition = exists().where(Organization.name == name)
+    if exclude_id is not None:
+        condition = condition.where(Organization.id != exclude_id)
+    return db.scalar(select(condition))
+
+
 @router.post(
     "/organizations",
     response_model=OrganizationSchema,
@@ -28,7 +47,7 @@ def generate_api_key() -> str:
     summary="Create organization",
     description="Create a new organization (admin only)"
 )
-async def create_organization(
+def create_organization(
     org_data: OrganizationCreate,
     db: Session = Depends(get_db)
 ):
@@ -38,40 +57,35 @@ async def create_organization(
     This endpoint is typically used for initial setup or by admin users.
     """
     try:
-        # Check if organization name already exists
-        existing_org = db.query(Organization).filter(
-            Organization.name == org_data.name
+        # Name dedupe and insert in one statement; a clashing name returns
+        # no row. 256-bit API keys don't collide in practice and the UNIQUE
+        # constraint on api_key is the backstop.
+        organizations = Organization.__table__
+        organization = db.execute(
+            pg_insert(organizations).values(
+                name=org_data.name,
+                api_key=generate_api_key()
+            ).on_conflict_do_nothing(
+                index_elements=["name"]
+            ).returning(*organizations.c)
         ).first()
         
-        if existing_org:
+        if not organization:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Organization '{org_data.name}' already exists"
             )
         
-        # Generate unique API key
-        api_key = generate_api_key()
-        
-        # Ensure API key is unique (very unlikely collision, but being safe)
-        while db.query(Organization).filter(Organization.api_key == api_key).first():
-            api_key = generate_api_key()
-        
-        organization = Organization(
-            name=org_data.name,
-            api_key=api_key
-        )
-        
-        db.add(organization)
         db.commit()
-        db.refresh(organization)
+        bump_resource_version("organizations")
         
-        logger.info(f"Created organization {organization.id}: {organization.name}")
+        logger.info("Created organization %s: %s", organization.id, organization.name)
         return organization
         
     except HTTPException:
         raise
-    except Exception as e:
-        logger.error(f"Error creating organization: {e}")
+    except Exception:
+        logger.exception("Error creating organization")
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -81,34 +95,81 @@ async def create_organization(
 
 @router.get(
     "/organizations",
-    response_model=List[OrganizationSchema],
+    response_model=OrganizationPage,
     summary="List organizations",
-    description="List all organizations (admin only)"
+    description="List organizations one page at a time (admin only)"
 )
-async def list_organizations(
+def list_organizations(
+    request: Request,
+    after_id: int = Query(0, ge=0),
+    size: int = Query(50, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
     """
-    List all organizations.
+    List organizations ordered by id, starting after `after_id`.
     
     This endpoint is typically restricted to admin users.
     """
-    organizations = db.query(Organization).all()
-    return organizations
+    # Any organization write bumps the version, so a matching ETag can be
+    # answered without querying
+    version = resource_version("organizations")
+    etag = compute_etag("organizations", version, after_id, size) if version else None
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    # Fetch one extra row to learn whether another page follows
+    organizations = db.query(Organization).filter(
+        Organization.id > after_id
+    ).order_by(Organization.id).limit(size + 1).all()
+    
+    has_more = len(organizations) > size
+    organizations = organizations[:size]
+    
+    # Validate and serialize the whole page with one prebuilt adapter,
+    # bypassing FastAPI's response model handling and jsonable_encoder
+    items = _ORG_LIST_ADAPTER.validate_python(organizations)
+    return ORJSONResponse(
+        content={
+            "items": _ORG_LIST_ADAPTER.dump_python(items, mode="json"),
+            "size": size,
+            "next_after_id": organizations[-1].id if has_more else None
+        },
+        headers={"ETag": etag} if etag else None
+    )
 
 
 @router.get(
     "/organizations/{org_id}",
-    response_model=OrganizationSchema,
+    response_model=Union[OrganizationWithBots, OrganizationSchema],
     summary="Get organization",
-    description="Get organization details (admin only)"
+    description="Get organization details, optionally with its bots (admin only)"
 )
-async def get_organization(
+def get_organization(
     org_id: int,
+    request: Request,
+    response: Response,
+    include_bots: bool = Query(False, description="Embed the organization's bots"),
     db: Session = Depends(get_db)
 ):
-    """Get details of a specific organization."""
-    organization = db.query(Organization).filter(Organization.id == org_id).first()
+    """
+    Get details of a specific organization.
+    
+    With `include_bots=true` the organization's bots are loaded in one extra
+    query (selectinload) and embedded in the response.
+    """
+    # Bot writes don't bump the organization version, so only the plain
+    # representation is ETagged
+    etag = None
+    if not include_bots:
+        version = resource_version(f"organization:{org_id}")
+        etag = compute_etag("organization", org_id, version) if version else None
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    
+    query = db.query(Organization).filter(Organization.id == org_id)
+    if include_bots:
+        query = query.options(selectinload(Organization.bots))
+    organization = query.first()
     
     if not organization:
         raise HTTPException(
@@ -116,7 +177,12 @@ async def get_organization(
             detail="Organization not found"
         )
     
-    return organization
+    if include_bots:
+        return OrganizationWithBots.model_validate(organization)
+    
+    if etag:
+        response.headers["ETag"] = etag
+    return OrganizationSchema.model_validate(organization)
 
 
 @router.put(
@@ -125,49 +191,66 @@ async def get_organization(
     summary="Update organization",
     description="Update organization details (admin only)"
 )
-async def update_organization(
+def update_organization(
     org_id: int,
     org_data: OrganizationUpdate,
     db: Session = Depends(get_db)
 ):
     """Update an organization."""
     try:
-        organization = db.query(Organization).filter(Organization.id == org_id).first()
+        update_data = org_data.model_dump(exclude_unset=True)
         
-        if not organization:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Organization not found"
-            )
-        
-        # Check for name conflicts if name is being updated
-        if org_data.name and org_data.name != organization.name:
-            existing_org = db.query(Organization).filter(
-                Organization.name == org_data.name,
-                Organization.id != org_id
+        if update_data and "name" not in update_data:
+            # No uniqueness check needed: update and read back in one statement
+            organizations = Organization.__table__
+            organization = db.execute(
+                update(organizations).where(
+                    organizations.c.id == org_id
+                ).values(**update_data).returning(*organizations.c)
             ).first()
             
-            if existing_org:
+            if not organization:
                 raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Organization '{org_data.name}' already exists"
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Organization not found"
                 )
+            
+            db.commit()
+        else:
+            organization = db.query(Organization).filter(Organization.id == org_id).first()
+            
+            if not organization:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Organization not found"
+                )
+            
+            # Check for name conflicts if name is being updated
+            if org_data.name and org_data.name != organization.name:
+                if org_name_exists(db, org_data.name, exclude_id=org_id):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Organization '{org_data.name}' already exists"
+                    )
+            
+            # Update fields
+            for field, value in update_data.items():
+                setattr(organization, field, value)
+            
+            db.commit()
+            db.refresh(organization)
         
-        # Update fields
-        update_data = org_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(organization, field, value)
-        
-        db.commit()
-        db.refresh(organization)
+        invalidate_api_key_cache(organization.api_key)
+        invalidate_cached_responses(organization.api_key)
+        bump_resource_version("organizations", f"organization:{org_id}")
         
-        logger.info(f"Updated organization {org_id}")
+        logger.info("Updated organization %s", org_id)
         return organization
         
     except HTTPException:
         raise
-    except Exception as e:
-        logger.error(f"Error updating organization {org_id}: {e}")
+    except Exception:
+        logger.exception("Error updating organization %s", org_id)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -181,7 +264,7 @@ async def update_organization(
     summary="Regenerate API key",
     description="Generate a new API key for the organization (admin only)"
 )
-async def regenerate_api_key(
+def regenerate_api_key(
     org_id: int,
     db: Session = Depends(get_db)
 ):
@@ -199,28 +282,34 @@ async def regenerate_api_key(
                 detail="Organization not found"
             )
         
-        # Generate new API key
-        new_api_key = generate_api_key()
-        
-        # Ensure API key is unique
-        while db.query(Organization).filter(Organization.api_key == new_api_key).first():
-            new_api_key = generate_api_key()
-        
+        # Generate new API key; uniqueness is enforced by the database
         old_api_key = organization.api_key
-        organization.api_key = new_api_key
+        organization.api_key = generate_api_key()
         
-        db.commit()
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            logger.exception("Constraint violation regenerating API key for organization %s", org_id)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error regenerating API key"
+            )
         db.refresh(organization)
+        invalidate_api_key_cache(old_api_key)
+        invalidate_cached_responses(old_api_key)
+        bump_resource_version("organizations", f"organization:{org_id}")
         
-        logger.info(f"Regenerated API key for organization {org_id}")
-        logger.warning(f"Old API key {old_api_key[:10]}... is now invalid")
+        logger.info("Regenerated API key for organization %s", org_id)
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning("Old API key %s... is now invalid", old_api_key[:10])
         
         return organization
         
     except HTTPException:
         raise
-    except Exception as e:
-        logger.error(f"Error regenerating API key for organization {org_id}: {e}")
+    except Exception:
+        logger.exception("Error regenerating API key for organization %s", org_id)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -234,7 +323,7 @@ async def regenerate_api_key(
     summary="Delete organization",
     description="Deactivate an organization (admin only)"
 )
-async def delete_organization(
+def delete_organization(
     org_id: int,
     db: Session = Depends(get_db)
 ):
@@ -244,34 +333,45 @@ async def delete_organization(
     This will deactivate the organization and all its bots.
     """
     try:
-        organization = db.query(Organization).filter(Organization.id == org_id).first()
+        # Soft delete the organization and deactivate all its bots in one
+        # statement:
+        #   WITH deactivated_org AS (UPDATE organizations ... RETURNING id, api_key),
+        #        deactivated_bots AS (UPDATE bots ... WHERE organization_id IN deactivated_org)
+        #   SELECT api_key FROM deactivated_org
+        deactivated_org = update(Organization).where(
+            Organization.id == org_id
+        ).values(is_active=False).returning(
+            Organization.id, Organization.api_key
+        ).cte("deactivated_org")
         
-        if not organization:
+        deactivated_bots = update(Bot).where(
+            Bot.organization_id.in_(select(deactivated_org.c.id))
+        ).values(status=BotStatus.INACTIVE).cte("deactivated_bots")
+        
+        api_key = db.scalar(
+            select(deactivated_org.c.api_key).add_cte(deactivated_bots)
+        )
+        
+        if not api_key:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Organization not found"
             )
         
-        # Soft delete by marking as inactive
-        organization.is_active = False
-        
-        # Also deactivate all bots in the organization
-        from app.models.models import Bot, BotStatus
-        db.query(Bot).filter(Bot.organization_id == org_id).update(
-            {Bot.status: BotStatus.INACTIVE}
-        )
-        
         db.commit()
+        invalidate_api_key_cache(api_key)
+        invalidate_cached_responses(api_key)
+        bump_resource_version("organizations", f"organization:{org_id}")
         
-        logger.info(f"Deactivated organization {org_id}")
+        logger.info("Deactivated organization %s", org_id)
         return SuccessResponse(
             message=f"Organization {org_id} deactivated successfully"
         )
         
     except HTTPException:
         raise
-    except Exception as e:
-        logger.error(f"Error deactivating organization {org_id}: {e}")
+    except Exception:
+        logger.exception("Error deactivating organization %s", org_id)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, EmailStr
 from typing import Optional, List, Dict, Any, Union
 from datetime import datetime
 from enum import Enum
@@ -25,8 +25,7 @@ class ResponseTypeEnum(str, Enum):
 
 # Base schemas
 class BaseSchema(BaseModel):
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Organization schemas
@@ -83,6 +82,20 @@ class Bot(BotBase):
     updated_at: Optional[datetime]
 
 
+class OrganizationWithBots(Organization):
+    bots: List[Bot] = []
+
+
+class BotListItem(BaseSchema):
+    """Pruned bot representation for list endpoints"""
+    id: int
+    name: str
+    description: Optional[str] = None
+    status: BotStatusEnum
+    language: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+
 # Intent schemas
 class IntentBase(BaseSchema):
     name: str = Field(..., min_length=1, max_length=255)
@@ -110,6 +123,15 @@ class Intent(IntentBase):
     updated_at: Optional[datetime]
 
 
+class IntentListItem(BaseSchema):
+    """Pruned intent representation for list endpoints"""
+    id: int
+    name: str
+    description: Optional[str] = None
+    is_active: bool
+    priority: int
+
+
 # Training Phrase schemas
 class TrainingPhraseBase(BaseSchema):
     text: str = Field(..., min_length=1)
@@ -131,11 +153,22 @@ class TrainingPhrase(TrainingPhraseBase):
     created_at: datetime
 
 
+class TrainingPhraseListItem(BaseSchema):
+    """Training phrase without fields already implied by the request path"""
+    id: int
+    text: str
+    entities_data: Optional[List[Dict[str, Any]]] = []
+
+
 # Response schemas
+# Read from the ORM attribute `meta` (the column is still "metadata")
+RESPONSE_METADATA_ALIAS = AliasChoices("meta", "metadata")
+
+
 class ResponseBase(BaseSchema):
     text: str = Field(..., min_length=1)
     response_type: Optional[ResponseTypeEnum] = ResponseTypeEnum.TEXT
-    metadata: Optional[Dict[str, Any]] = {}
+    metadata: Optional[Dict[str, Any]] = Field({}, validation_alias=RESPONSE_METADATA_ALIAS)
     priority: Optional[int] = 0
 
 
@@ -156,6 +189,15 @@ class Response(ResponseBase):
     created_at: datetime
 
 
+class ResponseListItem(BaseSchema):
+    """Response without fields already implied by the request path"""
+    id: int
+    text: str
+    response_type: Optional[ResponseTypeEnum] = ResponseTypeEnum.TEXT
+    metadata: Optional[Dict[str, Any]] = Field({}, validation_alias=RESPONSE_METADATA_ALIAS)
+    priority: Optional[int] = 0
+
+
 # Entity schemas
 class EntityBase(BaseSchema):
     name: str = Field(..., min_length=1, max_length=255)
@@ -223,7 +265,8 @@ class TrainingRequest(BaseSchema):
 
 class TrainingResponse(BaseSchema):
     status: str
-    metrics: Dict[str, Any]
+    training_id: Optional[int] = None
+    metrics: Dict[str, Any] = {}
     message: str
 
 
@@ -249,11 +292,23 @@ class BotAnalytics(BaseSchema):
 
 
 # Bulk operations
+class BulkIntentItem(IntentBase):
+    training_phrases: List[str] = []
+
+
 class BulkIntentCreate(BaseSchema):
-    intents: List[Dict[str, Any]]
+    intents: List[BulkIntentItem] = Field(..., min_length=1, max_length=1000)
     bot_id: int
 
 
+class BulkTrainingPhraseCreate(BaseSchema):
+    training_phrases: List[TrainingPhraseBase] = Field(..., min_length=1, max_length=5000)
+
+
+class BulkResponseCreate(BaseSchema):
+    responses: List[ResponseBase] = Field(..., min_length=1, max_length=1000)
+
+
 class BulkTrainingData(BaseSchema):
     training_data: List[Dict[str, Any]]
     bot_id: int
@@ -284,4 +339,15 @@ class PaginatedResponse(BaseSchema):
     total: int
     page: int
     size: int
-    pages: int
\ No newline at end of file
+    pages: int
+
+
+class KeysetPage(BaseSchema):
+    """Page of a keyset-paginated listing; pass next_after_id back as after_id"""
+    items: List[Any]
+    size: int
+    next_after_id: Optional[int] = None
+
+
+class OrganizationPage(KeysetPage):
+    items: List[Organization]
\ No newline at end of file
@@ -1,14 +1,18 @@
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
+from contextlib import asynccontextmanager
+import anyio
 import logging
 import os
 
 from app.core.config import settings
-from app.models.database import get_db, engine
+from app.models.database import get_db, engine, redis_client, async_redis_client
 from app.models.models import Base
 from app.api.endpoints import chat, bots, intents, organizations
+from app.api.cache import ResponseCacheMiddleware
+from app.nlp.onnx_encoder import get_onnx_encoder, onnx_available
 
 # Configure logging
 logging.basicConfig(
@@ -17,8 +21,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown tasks"""
+    logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
+    
+    # Size the threadpool that runs the sync handlers to the DB pool, so
+    # requests wait for a thread rather than for a pooled connection
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    
+    # Create database tables (off the event loop; disable once the schema
+    # is managed by migrations)
+    if settings.CREATE_TABLES_ON_STARTUP:
+        await anyio.to_thread.run_sync(lambda: Base.metadata.create_all(bind=engine))
+    
+    # Create necessary directories
+    os.makedirs(settings.MODELS_DIR, exist_ok=True)
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    os.makedirs(settings.VECTOR_DB_PATH, exist_ok=True)
+    
+    # Export/load the ONNX encoder now rather than on the first chat request;
+    # workers starting together wait on the export lock and share one export
+    if settings.USE_ONNX_ENCODER and onnx_available():
+        await anyio.to_thread.run_sync(get_onnx_encoder, settings.SENTENCE_TRANSFORMER_MODEL)
+    
+    logger.info("Application startup completed")
+    
+    yield
+    
+    logger.info("Application shutting down")
+    
+    # Release pooled connections so restarts don't leave them open
+    engine.dispose()
+    redis_client.close()
+    await async_redis_client.close()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -56,9 +94,14 @@ app = FastAPI(
     5. Start chatting!
     """,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Cache read-heavy GET responses in Redis
+app.add_middleware(ResponseCacheMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -97,7 +140,7 @@ app.include_router(
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     logger.error(f"Global exception: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "success": False,
@@ -127,30 +170,15 @@ async def root():
         "health_url": "/health"
     }
 
-# Startup event
-@app.on_event("startup")
-async def startup_event():
-    """Application startup tasks"""
-    logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
-    
-    # Create necessary directories
-    os.makedirs(settings.MODELS_DIR, exist_ok=True)
-    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-    os.makedirs(settings.VECTOR_DB_PATH, exist_ok=True)
-    
-    logger.info("Application startup completed")
-
-# Shutdown event
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Application shutdown tasks"""
-    logger.info("Application shutting down")
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        # reload only supports a single process
+        workers=1 if settings.DEBUG else (settings.WORKERS or os.cpu_count() or 2),
+        loop="uvloop",
+        http="httptools"
     )
\ No newline at end of file
@@ -3,14 +3,30 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
 import redis
+import redis.asyncio
 
 # PostgreSQL Database
-engine = create_engine(settings.DATABASE_URL)
+# psycopg2 has no server-side prepared statements, so the statement cache
+# that helps here is SQLAlchemy's compiled-SQL cache: recurring queries
+# (API key lookup, bot by id, counts) skip re-compilation on every call.
+engine = create_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    query_cache_size=1024,
+    # Batch executemany UPDATE/DELETE with execute_batch; INSERTs already
+    # use multi-row VALUES ("insertmanyvalues")
+    executemany_mode="values_plus_batch"
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 # Redis Connection
 redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+async_redis_client = redis.asyncio.from_url(settings.REDIS_URL, decode_responses=True)
 
 
 def get_db() -> Session:
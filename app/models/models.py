@@ -1,4 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, JSON, Enum
+from sqlalchemy import (
+    Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, Enum,
+    Index, UniqueConstraint, text
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.database import Base
@@ -21,16 +25,26 @@ class ConversationStatus(enum.Enum):
 
 class Organization(Base):
     __tablename__ = "organizations"
+    __table_args__ = (
+        # API key auth runs on every request; INCLUDE lets it be answered
+        # from the index alone, and the index also enforces key uniqueness
+        Index(
+            "ix_org_api_key_cover", "api_key",
+            unique=True, postgresql_include=["id", "is_active"]
+        ),
+        # Name lookups on create/update, and the ON CONFLICT (name) arbiter
+        Index("ix_org_name", "name", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
-    api_key = Column(String(255), unique=True, nullable=False)
+    api_key = Column(String(255), nullable=False)  # unique via ix_org_api_key_cover
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    bots = relationship("Bot", back_populates="organization")
+    bots = relationship("Bot", back_populates="organization", lazy="raise_on_sql")
 
 
 class Bot(Base):
@@ -39,24 +53,28 @@ class Bot(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     description = Column(Text)
-    organization_id = Column(Integer, ForeignKey("organizations.id"))
+    organization_id = Column(Integer, ForeignKey("organizations.id"), index=True)
     status = Column(Enum(BotStatus), default=BotStatus.ACTIVE)
     default_response = Column(Text, default="I'm sorry, I didn't understand that. Could you please rephrase?")
     confidence_threshold = Column(Float, default=0.7)
     language = Column(String(10), default="en")
-    settings = Column(JSON, default={})
+    settings = Column(JSONB, default=dict, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
-    # Relationships
+    # Relationships (collections must be eager-loaded explicitly)
     organization = relationship("Organization", back_populates="bots")
-    intents = relationship("Intent", back_populates="bot")
-    entities = relationship("Entity", back_populates="bot")
-    conversations = relationship("Conversation", back_populates="bot")
+    intents = relationship("Intent", back_populates="bot", lazy="raise_on_sql")
+    entities = relationship("Entity", back_populates="bot", lazy="raise_on_sql")
+    conversations = relationship("Conversation", back_populates="bot", lazy="raise_on_sql")
 
 
 class Intent(Base):
     __tablename__ = "intents"
+    __table_args__ = (
+        UniqueConstraint("bot_id", "name", name="uq_intent_bot_name"),
+        Index("ix_intent_bot_active", "bot_id", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -69,8 +87,9 @@ class Intent(Base):
     
     # Relationships
     bot = relationship("Bot", back_populates="intents")
-    training_phrases = relationship("TrainingPhrase", back_populates="intent")
-    responses = relationship("Response", back_populates="intent")
+    # Children are removed by ON DELETE CASCADE in the database
+    training_phrases = relationship("TrainingPhrase", back_populates="intent", passive_deletes=True)
+    responses = relationship("Response", back_populates="intent", passive_deletes=True)
 
 
 class TrainingPhrase(Base):
@@ -78,8 +97,8 @@ class TrainingPhrase(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     text = Column(Text, nullable=False)
-    intent_id = Column(Integer, ForeignKey("intents.id"))
-    entities_data = Column(JSON, default=[])  # Store entity annotations
+    intent_id = Column(Integer, ForeignKey("intents.id", ondelete="CASCADE"), index=True)
+    entities_data = Column(JSONB, default=list, nullable=False)  # Store entity annotations
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
@@ -91,9 +110,10 @@ class Response(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     text = Column(Text, nullable=False)
-    intent_id = Column(Integer, ForeignKey("intents.id"))
+    intent_id = Column(Integer, ForeignKey("intents.id", ondelete="CASCADE"), index=True)
     response_type = Column(String(50), default="text")  # text, rich, custom
-    metadata = Column(JSON, default={})  # For rich responses, buttons, etc.
+    # "metadata" is reserved on declarative classes; keep it as the column name
+    meta = Column("metadata", JSONB, default=dict, nullable=False)  # For rich responses, buttons, etc.
     priority = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -109,7 +129,7 @@ class Entity(Base):
     description = Column(Text)
     bot_id = Column(Integer, ForeignKey("bots.id"))
     entity_type = Column(String(50), default="custom")  # custom, system, regex
-    values = Column(JSON, default=[])  # Entity values and synonyms
+    values = Column(JSONB, default=list, nullable=False)  # Entity values and synonyms
     regex_pattern = Column(String(500))  # For regex entities
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -121,20 +141,30 @@ class Entity(Base):
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        # At most one active conversation per session and bot; also the
+        # ON CONFLICT arbiter for the chat upsert. Ended conversations are
+        # left out so a session can be restarted any number of times.
+        Index(
+            "uq_conversation_active_session", "session_id", "bot_id",
+            unique=True,
+            postgresql_where=text("status = 'ACTIVE'")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String(255), nullable=False, index=True)
     bot_id = Column(Integer, ForeignKey("bots.id"))
     user_id = Column(String(255))  # External user identifier
     status = Column(Enum(ConversationStatus), default=ConversationStatus.ACTIVE)
-    context = Column(JSON, default={})  # Conversation context and variables
-    metadata = Column(JSON, default={})  # Additional metadata
+    context = Column(JSONB, default=dict, nullable=False)  # Conversation context and variables
+    meta = Column("metadata", JSONB, default=dict, nullable=False)  # Additional metadata
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     ended_at = Column(DateTime(timezone=True))
     
     # Relationships
     bot = relationship("Bot", back_populates="conversations")
-    messages = relationship("Message", back_populates="conversation")
+    messages = relationship("Message", back_populates="conversation", lazy="raise_on_sql")
 
 
 class Message(Base):
@@ -146,7 +176,7 @@ class Message(Base):
     bot_response = Column(Text)
     intent_detected = Column(String(255))
     confidence_score = Column(Float)
-    entities_extracted = Column(JSON, default=[])
+    entities_extracted = Column(JSONB, default=list, nullable=False)
     response_time_ms = Column(Integer)
     feedback_rating = Column(Integer)  # 1-5 rating
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -163,7 +193,7 @@ class TrainingJob(Base):
     status = Column(String(50), default="pending")  # pending, running, completed, failed
     model_version = Column(String(50))
     training_data_hash = Column(String(255))
-    metrics = Column(JSON, default={})  # Training metrics
+    metrics = Column(JSONB, default=dict, nullable=False)  # Training metrics
     error_message = Column(Text)
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True))
@@ -184,7 +214,7 @@ class Analytics(Base):
     unresolved_queries = Column(Integer, default=0)
     avg_response_time_ms = Column(Float, default=0.0)
     user_satisfaction = Column(Float, default=0.0)
-    top_intents = Column(JSON, default=[])
+    top_intents = Column(JSONB, default=list, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
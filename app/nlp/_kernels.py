@@ -0,0 +1,61 @@
+"""Numba-compiled kernels for NLP hot loops, with plain-Python fallbacks"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # optional; kernels run as ordinary Python
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+    prange = range
+
+
+@njit(cache=True)
+def resolve_sweep(start, end, confidence):
+    """
+    Mask of the spans kept by overlap resolution.
+    
+    Spans must be sorted by start, most confident first among equal starts.
+    A span overlapping the last kept one replaces it only when strictly more
+    confident, so the kept spans never overlap.
+    """
+    n = start.shape[0]
+    keep = np.zeros(n, dtype=np.bool_)
+    last = -1
+    
+    for i in range(n):
+        if last >= 0 and start[i] < end[last]:
+            if confidence[i] > confidence[last]:
+                keep[last] = False
+                keep[i] = True
+                last = i
+        else:
+            keep[i] = True
+            last = i
+            
+    return keep
+
+
+@njit(cache=True, parallel=True)
+def int8_matvec(matrix, vector):
+    """
+    Row-wise dot products of an int8 matrix with an int8 vector.
+    
+    Accumulates in int32 one row at a time, so the matrix is read once as
+    int8 instead of being upcast to a full int32 copy per query.
+    """
+    n, dim = matrix.shape
+    out = np.empty(n, dtype=np.int32)
+    
+    for i in prange(n):
+        acc = 0
+        for j in range(dim):
+            acc += np.int32(matrix[i, j]) * np.int32(vector[j])
+        out[i] = acc
+        
+    return out
@@ -1,12 +1,130 @@
 import re
+import bisect
+import threading
+import numpy as np
 import spacy
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
 from app.models.models import Entity
 from app.core.config import settings
+from app.nlp._kernels import HAVE_NUMBA, resolve_sweep
 import logging
 
+try:
+    import ahocorasick
+except ImportError:  # optional; custom entities fall back to substring scans
+    ahocorasick = None
+
+try:
+    import re2
+except ImportError:  # optional; regex entities fall back to the re module
+    re2 = None
+
+try:
+    import marisa_trie
+except ImportError:  # optional; value suggestions fall back to a sorted list
+    marisa_trie = None
+
 logger = logging.getLogger(__name__)
 
+# Below this many candidates the pure-Python sweep beats marshalling to arrays
+_SWEEP_KERNEL_MIN_ENTITIES = 64
+
+# Pipeline components NER does not need; skipping them saves a model run per doc
+_SPACY_UNUSED_PIPES = ("tagger", "parser", "attribute_ruler", "lemmatizer")
+
+# Common patterns: group name -> (pattern, entity, confidence). Alternatives
+# are tried in this order, so longer structures win over the numbers in them.
+_COMMON_PATTERNS = {
+    'url': (r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', 'sys.url', 0.95),
+    'email': (r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', 'sys.email', 0.95),
+    'phone': (r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b', 'sys.phone', 0.9),
+    'number': (r'\b\d+(?:\.\d+)?\b', 'sys.number', 0.85),
+}
+
+# All common patterns fused into one alternation, compiled once at import
+_COMMON_RE = re.compile('|'.join(
+    f'(?P<{name}>{pattern})' for name, (pattern, _, _) in _COMMON_PATTERNS.items()
+))
+
+
+def _compile_entity_pattern(pattern: str):
+    """
+    Compile a user-supplied entity regex, case-insensitively.
+    
+    RE2 matches in linear time, so a pathological pattern cannot stall
+    extraction with catastrophic backtracking. Patterns using syntax RE2
+    does not support (backreferences, lookaround) use the re module.
+    """
+    if re2 is not None:
+        try:
+            return re2.compile(f"(?i){pattern}")
+        except re2.error:
+            logger.debug("Pattern not supported by RE2, using re: %s", pattern)
+    return re.compile(pattern, re.IGNORECASE)
+
+
+_spacy_models: Dict[str, Any] = {}
+_spacy_lock = threading.Lock()
+
+
+def _get_spacy(model_name: str):
+    """
+    One spaCy pipeline per model for the whole process, shared by all bots.
+    
+    Returns None (also cached) when the model is not installed.
+    """
+    with _spacy_lock:
+        if model_name not in _spacy_models:
+            try:
+                nlp = spacy.load(model_name)
+                nlp.select_pipes(
+                    disable=[name for name in _SPACY_UNUSED_PIPES if name in nlp.pipe_names]
+                )
+            except OSError:
+                logger.warning("SpaCy model %s not found. Entity extraction will be limited.", model_name)
+                nlp = None
+            _spacy_models[model_name] = nlp
+        return _spacy_models[model_name]
+
+
+class Candidate(NamedTuple):
+    """A matched span; only the survivors of conflict resolution become dicts"""
+    start: int
+    end: int
+    confidence: float
+    entity: str
+    value: Any
+    method: str
+    raw_value: Optional[str] = None
+    label: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        entity = {
+            'entity': self.entity,
+            'value': self.value,
+            'start': self.start,
+            'end': self.end,
+            'confidence': self.confidence,
+            'method': self.method
+        }
+        if self.raw_value is not None:
+            entity['raw_value'] = self.raw_value
+        if self.label is not None:
+            entity['label'] = self.label
+        return entity
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    """Whether text[start:end] is not part of a longer word"""
+    return (
+        (start == 0 or not _is_word_char(text[start - 1])) and
+        (end == len(text) or not _is_word_char(text[end]))
+    )
+
 
 class EntityExtractor:
     """Entity extraction using multiple approaches"""
@@ -15,16 +133,14 @@ class EntityExtractor:
         self.bot_id = bot_id
         self.entities = {}
         self.regex_entities = {}
+        self._custom_terms = []
+        self._automaton = None
         self.nlp = None
         self._load_spacy_model()
         
     def _load_spacy_model(self):
         """Load spaCy model for NER"""
-        try:
-            self.nlp = spacy.load(settings.SPACY_MODEL)
-        except OSError:
-            logger.warning(f"SpaCy model {settings.SPACY_MODEL} not found. Entity extraction will be limited.")
-            self.nlp = None
+        self.nlp = _get_spacy(settings.SPACY_MODEL)
     
     def load_entities(self, entities: List[Entity]):
         """Load entity definitions for the bot"""
@@ -37,203 +153,217 @@ class EntityExtractor:
                 
             if entity.entity_type == "regex" and entity.regex_pattern:
                 self.regex_entities[entity.name] = {
-                    'pattern': re.compile(entity.regex_pattern, re.IGNORECASE),
+                    'pattern': _compile_entity_pattern(entity.regex_pattern),
                     'description': entity.description
                 }
             elif entity.entity_type in ["custom", "system"]:
                 self.entities[entity.name] = {
                     'values': entity.values or [],
+                    'canon': {},  # lowercased value/synonym -> canonical value
                     'type': entity.entity_type,
                     'description': entity.description
                 }
+        
+        self._build_custom_matcher()
                 
-        logger.info(f"Loaded {len(self.entities)} custom entities and {len(self.regex_entities)} regex entities for bot {self.bot_id}")
+        logger.info(
+            "Loaded %s custom entities and %s regex entities for bot %s",
+            len(self.entities), len(self.regex_entities), self.bot_id
+        )
+    
+    def _build_custom_matcher(self):
+        """Index every custom entity value and synonym for a single-pass scan"""
+        self._custom_terms = []
+        
+        for entity_name, entity_data in self.entities.items():
+            for value_info in entity_data['values']:
+                if isinstance(value_info, str):
+                    value = value_info
+                    synonyms = []
+                elif isinstance(value_info, dict):
+                    value = value_info.get('value', '')
+                    synonyms = value_info.get('synonyms', [])
+                else:
+                    continue
+                
+                for term in [value.lower()] + [syn.lower() for syn in synonyms]:
+                    if term:
+                        self._custom_terms.append((term, entity_name, value))
+                        entity_data['canon'][term] = value
+        
+        self._automaton = None
+        if ahocorasick is None:
+            # One alternation per entity, longest terms first so they win;
+            # the lookarounds match whole words even for terms like "c++"
+            for entity_data in self.entities.values():
+                terms = sorted(entity_data['canon'], key=len, reverse=True)
+                entity_data['regex'] = re.compile(
+                    r'(?<!\w)(?:' + '|'.join(map(re.escape, terms)) + r')(?!\w)'
+                ) if terms else None
+        elif self._custom_terms:
+            automaton = ahocorasick.Automaton()
+            for term, entity_name, value in self._custom_terms:
+                # A term can belong to several entities/values
+                matches = automaton.get(term, [])
+                matches.append((term, entity_name, value))
+                automaton.add_word(term, matches)
+            automaton.make_automaton()
+            self._automaton = automaton
+            
+        # Prefix index over each entity's terms for suggest_values()
+        for entity_data in self.entities.values():
+            if marisa_trie is not None:
+                entity_data['trie'] = marisa_trie.Trie(entity_data['canon'])
+            else:
+                entity_data['sorted_terms'] = sorted(entity_data['canon'])
+    
+    def suggest_values(self, entity_name: str, prefix: str, limit: int = 10) -> List[str]:
+        """Canonical values of a custom entity with a term starting with prefix"""
+        entity_data = self.entities.get(entity_name)
+        if not entity_data:
+            return []
+            
+        prefix = prefix.lower()
+        if 'trie' in entity_data:
+            terms = entity_data['trie'].iterkeys(prefix)
+        else:
+            sorted_terms = entity_data['sorted_terms']
+            start = bisect.bisect_left(sorted_terms, prefix)
+            terms = (sorted_terms[i] for i in range(start, len(sorted_terms)))
+            
+        suggestions = []
+        for term in terms:
+            if not term.startswith(prefix):
+                break
+            value = entity_data['canon'][term]
+            if value not in suggestions:
+                suggestions.append(value)
+                if len(suggestions) >= limit:
+                    break
+                    
+        return suggestions
     
     def extract(self, text: str, intent_name: Optional[str] = None) -> List[Dict[str, Any]]:
         """Extract entities from text using multiple approaches"""
-        entities_found = []
+        doc = self.nlp(text) if self.nlp else None
+        return self._extract(text, doc)
+    
+    def extract_batch(self, texts: List[str], batch_size: int = 64) -> List[List[Dict[str, Any]]]:
+        """Extract entities from many texts, running spaCy over them in batches"""
+        if self.nlp:
+            docs = self.nlp.pipe(texts, batch_size=batch_size)
+        else:
+            docs = [None] * len(texts)
+            
+        return [self._extract(text, doc) for text, doc in zip(texts, docs)]
+    
+    def _extract(self, text: str, doc) -> List[Dict[str, Any]]:
+        candidates = []
         text_lower = text.lower()
         
         # 1. Extract regex entities
-        entities_found.extend(self._extract_regex_entities(text))
+        candidates.extend(self._extract_regex_entities(text))
         
         # 2. Extract custom entities
-        entities_found.extend(self._extract_custom_entities(text_lower))
+        candidates.extend(self._extract_custom_entities(text_lower))
         
         # 3. Extract system entities using spaCy
-        if self.nlp:
-            entities_found.extend(self._extract_system_entities(text))
+        if doc is not None:
+            candidates.extend(self._extract_system_entities(doc))
             
         # 4. Extract numbers, dates, and other common patterns
-        entities_found.extend(self._extract_common_patterns(text))
+        candidates.extend(self._extract_common_patterns(text))
         
         # Remove duplicates and overlapping entities
-        entities_found = self._resolve_conflicts(entities_found, text)
-        
-        return entities_found
+        return [candidate.to_dict() for candidate in self._resolve_conflicts(candidates)]
     
-    def _extract_regex_entities(self, text: str) -> List[Dict[str, Any]]:
+    def _extract_regex_entities(self, text: str) -> Iterator[Candidate]:
         """Extract entities using regex patterns"""
-        entities = []
-        
         for entity_name, entity_data in self.regex_entities.items():
-            pattern = entity_data['pattern']
-            matches = pattern.finditer(text)
-            
-            for match in matches:
-                entities.append({
-                    'entity': entity_name,
-                    'value': match.group(),
-                    'start': match.start(),
-                    'end': match.end(),
-                    'confidence': 1.0,
-                    'method': 'regex'
-                })
-                
-        return entities
+            for match in entity_data['pattern'].finditer(text):
+                yield Candidate(match.start(), match.end(), 1.0, entity_name, match.group(), 'regex')
     
-    def _extract_custom_entities(self, text_lower: str) -> List[Dict[str, Any]]:
+    def _extract_custom_entities(self, text_lower: str) -> Iterator[Candidate]:
         """Extract custom entities using value matching"""
-        entities = []
+        if self._automaton is not None:
+            # One Aho-Corasick pass over the text finds every term occurrence
+            for end_idx, matches in self._automaton.iter(text_lower):
+                for term, entity_name, value in matches:
+                    start_idx = end_idx - len(term) + 1
+                    if _is_whole_word(text_lower, start_idx, end_idx + 1):
+                        # Always return the canonical value
+                        yield Candidate(start_idx, end_idx + 1, 0.9, entity_name, value, 'custom', term)
+            return
         
         for entity_name, entity_data in self.entities.items():
-            values = entity_data['values']
-            
-            for value_info in values:
-                if isinstance(value_info, str):
-                    value = value_info
-                    synonyms = []
-                elif isinstance(value_info, dict):
-                    value = value_info.get('value', '')
-                    synonyms = value_info.get('synonyms', [])
-                else:
-                    continue
-                    
-                # Check main value and synonyms
-                search_terms = [value.lower()] + [syn.lower() for syn in synonyms]
+            pattern = entity_data.get('regex')
+            if pattern is None:
+                continue
                 
-                for term in search_terms:
-                    if term in text_lower:
-                        start_idx = text_lower.find(term)
-                        if start_idx != -1:
-                            entities.append({
-                                'entity': entity_name,
-                                'value': value,  # Always return the canonical value
-                                'raw_value': term,
-                                'start': start_idx,
-                                'end': start_idx + len(term),
-                                'confidence': 0.9,
-                                'method': 'custom'
-                            })
-                            
-        return entities
+            for match in pattern.finditer(text_lower):
+                term = match.group()
+                yield Candidate(
+                    match.start(), match.end(), 0.9,
+                    entity_name, entity_data['canon'][term], 'custom', term
+                )
     
-    def _extract_system_entities(self, text: str) -> List[Dict[str, Any]]:
-        """Extract system entities using spaCy NER"""
-        entities = []
-        
-        if not self.nlp:
-            return entities
-            
-        doc = self.nlp(text)
-        
+    def _extract_system_entities(self, doc) -> Iterator[Candidate]:
+        """Extract system entities from a spaCy-processed document"""
         for ent in doc.ents:
-            entities.append({
-                'entity': f"sys.{ent.label_.lower()}",
-                'value': ent.text,
-                'start': ent.start_char,
-                'end': ent.end_char,
-                'confidence': 0.8,
-                'method': 'spacy',
-                'label': ent.label_
-            })
-            
-        return entities
+            yield Candidate(
+                ent.start_char, ent.end_char, 0.8,
+                f"sys.{ent.label_.lower()}", ent.text, 'spacy', label=ent.label_
+            )
     
-    def _extract_common_patterns(self, text: str) -> List[Dict[str, Any]]:
+    def _extract_common_patterns(self, text: str) -> Iterator[Candidate]:
         """Extract common patterns like numbers, emails, phone numbers"""
-        entities = []
-        
-        # Email pattern
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        for match in re.finditer(email_pattern, text):
-            entities.append({
-                'entity': 'sys.email',
-                'value': match.group(),
-                'start': match.start(),
-                'end': match.end(),
-                'confidence': 0.95,
-                'method': 'pattern'
-            })
-        
-        # Phone number pattern (basic)
-        phone_pattern = r'\b(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})\b'
-        for match in re.finditer(phone_pattern, text):
-            entities.append({
-                'entity': 'sys.phone',
-                'value': match.group(),
-                'start': match.start(),
-                'end': match.end(),
-                'confidence': 0.9,
-                'method': 'pattern'
-            })
-        
-        # Number pattern
-        number_pattern = r'\b\d+(?:\.\d+)?\b'
-        for match in re.finditer(number_pattern, text):
-            try:
-                value = float(match.group()) if '.' in match.group() else int(match.group())
-                entities.append({
-                    'entity': 'sys.number',
-                    'value': value,
-                    'raw_value': match.group(),
-                    'start': match.start(),
-                    'end': match.end(),
-                    'confidence': 0.85,
-                    'method': 'pattern'
-                })
-            except ValueError:
-                continue
-        
-        # URL pattern
-        url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        for match in re.finditer(url_pattern, text):
-            entities.append({
-                'entity': 'sys.url',
-                'value': match.group(),
-                'start': match.start(),
-                'end': match.end(),
-                'confidence': 0.95,
-                'method': 'pattern'
-            })
+        # One pass over the text; the matching group names the pattern
+        for match in _COMMON_RE.finditer(text):
+            _, entity_name, confidence = _COMMON_PATTERNS[match.lastgroup]
+            raw_value = match.group()
             
-        return entities
+            if match.lastgroup == 'number':
+                try:
+                    value = float(raw_value) if '.' in raw_value else int(raw_value)
+                except ValueError:
+                    continue
+                yield Candidate(
+                    match.start(), match.end(), confidence,
+                    entity_name, value, 'pattern', raw_value
+                )
+            else:
+                yield Candidate(
+                    match.start(), match.end(), confidence,
+                    entity_name, raw_value, 'pattern'
+                )
     
-    def _resolve_conflicts(self, entities: List[Dict[str, Any]], text: str) -> List[Dict[str, Any]]:
+    def _resolve_conflicts(self, candidates: List[Candidate]) -> List[Candidate]:
         """Resolve overlapping entities by keeping the most confident ones"""
-        if not entities:
-            return entities
+        if not candidates:
+            return candidates
             
-        # Sort by start position
-        entities.sort(key=lambda x: x['start'])
+        # Sort by start position, most confident first among equal starts
+        candidates.sort(key=lambda c: (c.start, -c.confidence))
+        
+        if HAVE_NUMBA and len(candidates) >= _SWEEP_KERNEL_MIN_ENTITIES:
+            keep = resolve_sweep(
+                np.fromiter((c.start for c in candidates), dtype=np.int32, count=len(candidates)),
+                np.fromiter((c.end for c in candidates), dtype=np.int32, count=len(candidates)),
+                np.fromiter((c.confidence for c in candidates), dtype=np.float64, count=len(candidates))
+            )
+            return [candidate for candidate, kept in zip(candidates, keep) if kept]
         
+        # Kept entities never overlap, so a new one can only clash with the last
         resolved = []
-        for entity in entities:
-            # Check for overlap with existing entities
-            overlaps = False
-            for existing in resolved:
-                if (entity['start'] < existing['end'] and entity['end'] > existing['start']):
-                    # There's an overlap - keep the one with higher confidence
-                    if entity['confidence'] > existing['confidence']:
-                        resolved.remove(existing)
-                        resolved.append(entity)
-                    overlaps = True
-                    break
-                    
-            if not overlaps:
-                resolved.append(entity)
+        for candidate in candidates:
+            if resolved and candidate.start < resolved[-1].end:
+                # There's an overlap - keep the one with higher confidence
+                if candidate.confidence > resolved[-1].confidence:
+                    resolved[-1] = candidate
+            else:
+                resolved.append(candidate)
                 
-        return sorted(resolved, key=lambda x: x['start'])
+        return resolved
     
     def annotate_text(self, text: str, entities: List[Dict[str, Any]]) -> str:
         """Annotate text with entity markup for training data"""
@@ -259,21 +389,9 @@ class EntityExtractor:
     def validate_entity_value(self, entity_name: str, value: str) -> bool:
         """Validate if a value is valid for a given entity"""
         if entity_name in self.entities:
-            entity_data = self.entities[entity_name]
-            values = entity_data['values']
+            # Values and synonyms were lowercased once at load time
+            return value.lower() in self.entities[entity_name]['canon']
             
-            for value_info in values:
-                if isinstance(value_info, str):
-                    if value.lower() == value_info.lower():
-                        return True
-                elif isinstance(value_info, dict):
-                    main_value = value_info.get('value', '')
-                    synonyms = value_info.get('synonyms', [])
-                    
-                    if (value.lower() == main_value.lower() or 
-                        value.lower() in [syn.lower() for syn in synonyms]):
-                        return True
-                        
         elif entity_name in self.regex_entities:
             pattern = self.regex_entities[entity_name]['pattern']
             return bool(pattern.match(value))
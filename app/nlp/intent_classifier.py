@@ -1,31 +1,210 @@
 import numpy as np
 import pickle
 import hashlib
-from typing import List, Dict, Tuple, Optional
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache, partial
+from typing import Callable, List, Dict, Tuple, Optional
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
 import joblib
 import os
+import shutil
 from app.core.config import settings
 from app.models.models import Intent, TrainingPhrase
+from app.nlp.onnx_encoder import get_onnx_encoder, onnx_available
+from app.nlp._kernels import HAVE_NUMBA, int8_matvec
 import logging
 
+try:
+    from blake3 import blake3
+except ImportError:  # optional; training data is hashed with blake2b instead
+    blake3 = None
+
 logger = logging.getLogger(__name__)
 
 
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale vectors (rows) to unit length so dot products are cosines"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+@lru_cache(maxsize=4096)
+def _normalize_text(text: str) -> str:
+    """Canonical form of a text for encoding and classification"""
+    return text.lower().strip()
+
+
+def _training_data_hash(texts: List[str], labels: List[str]) -> str:
+    """Short digest of the training data, streamed pair by pair"""
+    digest = blake3() if blake3 is not None else hashlib.blake2b(digest_size=5)
+    for text, label in zip(texts, labels):
+        digest.update(text.encode())
+        digest.update(b'\0')
+        digest.update(label.encode())
+        digest.update(b'\n')
+    return digest.hexdigest(length=5) if blake3 is not None else digest.hexdigest()
+
+
+def _quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric int8 quantization with one scale per vector (row)"""
+    scale = np.max(np.abs(vectors), axis=-1, keepdims=True) / 127
+    scale[scale == 0] = 1.0
+    quantized = np.round(vectors / scale).astype(np.int8)
+    return quantized, np.squeeze(scale, axis=-1).astype(np.float32)
+
+
+# File in a bot's model directory naming the version directory to load
+_CURRENT_VERSION_FILE = 'CURRENT'
+# Version directories kept on disk: the current one and its predecessor,
+# which workers that read the pointer just before a swap may still open
+_KEPT_VERSIONS = 2
+
+
+_sentence_transformer_lock = threading.Lock()
+
+
+@lru_cache(maxsize=4)
+def _cached_sentence_transformer(model_name: str) -> SentenceTransformer:
+    return SentenceTransformer(model_name)
+
+
+def _get_sentence_transformer(model_name: str) -> SentenceTransformer:
+    """One SentenceTransformer per model for the whole process, shared by all bots"""
+    with _sentence_transformer_lock:
+        return _cached_sentence_transformer(model_name)
+
+
+def _load_encoder(model_name: str):
+    """The sentence encoder: ONNX Runtime when enabled and installed, else PyTorch"""
+    if settings.USE_ONNX_ENCODER:
+        if onnx_available():
+            return get_onnx_encoder(model_name)
+        logger.warning("USE_ONNX_ENCODER is set but onnxruntime/optimum are not installed")
+    return _get_sentence_transformer(model_name)
+
+
+def _encode_normalized(model, texts: List[str]) -> np.ndarray:
+    return model.encode(
+        texts,
+        batch_size=settings.ENCODER_MAX_BATCH_SIZE,
+        convert_to_numpy=True,
+        normalize_embeddings=True
+    )
+
+
+class BatchingEncoder:
+    """
+    Coalesces concurrent single-text encodes into batched forward passes.
+    
+    Request threads enqueue a text and block on a future; one worker thread
+    collects up to max_batch_size texts, waiting at most max_wait_ms after the
+    first, and encodes them with a single call.
+    """
+    
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5
+    ):
+        self._encode_fn = encode_fn
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="batching-encoder", daemon=True)
+        self._worker.start()
+        
+    def encode_one(self, text: str) -> np.ndarray:
+        """Encode a single text, sharing a forward pass with concurrent callers"""
+        future = Future()
+        self._queue.put((text, future))
+        return future.result()
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._max_wait
+            
+            while len(batch) < self._max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                    
+            try:
+                embeddings = self._encode_fn([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+                
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+
+
+_batching_encoders: Dict[str, BatchingEncoder] = {}
+_batching_encoders_lock = threading.Lock()
+
+
+def _get_batching_encoder(model_name: str, model) -> BatchingEncoder:
+    """Process-wide batching encoder per model, so requests for any bot share batches"""
+    with _batching_encoders_lock:
+        encoder = _batching_encoders.get(model_name)
+        if encoder is None:
+            encoder = BatchingEncoder(
+                partial(_encode_normalized, model),
+                max_batch_size=settings.ENCODER_MAX_BATCH_SIZE,
+                max_wait_ms=settings.ENCODER_MAX_WAIT_MS
+            )
+            _batching_encoders[model_name] = encoder
+        return encoder
+
+
+@lru_cache(maxsize=settings.EMBEDDING_CACHE_SIZE)
+def _cached_embedding(model_name: str, text: str) -> np.ndarray:
+    """Query embedding memo shared across requests, so repeated utterances encode once"""
+    embedding = _batching_encoders[model_name].encode_one(text)
+    embedding.flags.writeable = False  # shared between callers
+    return embedding
+
+
+# Process-wide counts for the early-exit rate log; updated from the request
+# threads and the NLP executor, so only under the lock
+_predict_stats = {"total": 0, "early_exit": 0}
+_predict_stats_lock = threading.Lock()
+
+
 class IntentClassifier:
     """Advanced intent classification using multiple approaches"""
     
     def __init__(self, bot_id: int):
         self.bot_id = bot_id
-        self.sentence_transformer = SentenceTransformer(settings.SENTENCE_TRANSFORMER_MODEL)
+        self.sentence_transformer = _load_encoder(settings.SENTENCE_TRANSFORMER_MODEL)
+        self.model_name = settings.SENTENCE_TRANSFORMER_MODEL
+        self.batching_encoder = _get_batching_encoder(self.model_name, self.sentence_transformer)
         self.rf_classifier = None
         self.tfidf_vectorizer = None
         self.intent_embeddings = {}
+        self._intent_names = []
+        self._intent_index = {}
+        self._rf_columns = None
+        self._intent_matrix = None
+        self._intent_matrix_q = None
+        self._intent_scale = None
         self.intent_labels = []
         self.training_texts = []
+        self.training_embeddings = None
         self.model_version = None
         
     def prepare_training_data(self, intents: List[Intent]) -> Tuple[List[str], List[str]]:
@@ -38,14 +217,73 @@ class IntentClassifier:
                 continue
                 
             for phrase in intent.training_phrases:
-                texts.append(phrase.text.lower().strip())
+                texts.append(_normalize_text(phrase.text))
                 labels.append(intent.name)
                 
         return texts, labels
     
+    def embed(self, text: str) -> np.ndarray:
+        """Normalized embedding of a query, memoized per normalized text"""
+        return _cached_embedding(self.model_name, _normalize_text(text))
+    
+    def encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Encode texts in one call, returning L2-normalized embeddings"""
+        return _encode_normalized(self.sentence_transformer, texts)
+    
+    def _build_intent_matrix(self, quantized: Optional[Tuple[np.ndarray, np.ndarray]] = None):
+        """
+        Stack the intent mean embeddings into one normalized row per intent.
+        
+        With QUANTIZE_EMBEDDINGS only the int8 matrix and its row scales are
+        kept, taken from `quantized` when the saved model has them.
+        """
+        self._intent_names = list(self.intent_embeddings)
+        self._intent_index = {name: i for i, name in enumerate(self._intent_names)}
+        self._rf_columns = None
+        self._intent_matrix = self._intent_matrix_q = self._intent_scale = None
+        if not self._intent_names:
+            return
+        
+        if settings.QUANTIZE_EMBEDDINGS:
+            if quantized is None:
+                quantized = _quantize_int8(self._intent_matrix_rows())
+            self._intent_matrix_q, self._intent_scale = quantized
+        else:
+            self._intent_matrix = self._intent_matrix_rows()
+    
+    def _intent_matrix_rows(self) -> np.ndarray:
+        return _l2_normalize(np.stack(
+            [self.intent_embeddings[name] for name in self._intent_names]
+        ))
+    
+    def _intent_similarities(self, text_embedding: np.ndarray) -> np.ndarray:
+        """Cosine similarity of a normalized text embedding to every intent"""
+        if self._intent_matrix is None and self._intent_matrix_q is None:
+            return np.empty(0, dtype=np.float32)
+        
+        if self._intent_matrix_q is not None:
+            # Integer dot products, rescaled by the intent and query scales
+            text_q, text_scale = _quantize_int8(text_embedding)
+            if HAVE_NUMBA:
+                dots = int8_matvec(self._intent_matrix_q, text_q)
+            else:
+                dots = self._intent_matrix_q.astype(np.int32) @ text_q.astype(np.int32)
+            return dots * self._intent_scale * text_scale
+        
+        return self._intent_matrix @ text_embedding
+    
+    def _classifier_columns(self) -> np.ndarray:
+        """Intent index of each n-gram classifier class, -1 if not an intent"""
+        if self._rf_columns is None:
+            self._rf_columns = np.array(
+                [self._intent_index.get(name, -1) for name in self.rf_classifier.classes_],
+                dtype=np.intp
+            )
+        return self._rf_columns
+    
     def train(self, intents: List[Intent]) -> Dict:
         """Train the intent classifier with multiple approaches"""
-        logger.info(f"Training intent classifier for bot {self.bot_id}")
+        logger.info("Training intent classifier for bot %s", self.bot_id)
         
         texts, labels = self.prepare_training_data(intents)
         
@@ -53,12 +291,20 @@ class IntentClassifier:
             raise ValueError("No training data available")
             
         # Create data hash for version tracking
-        data_hash = hashlib.md5(str(texts + labels).encode()).hexdigest()[:10]
-        self.model_version = f"bot_{self.bot_id}_{data_hash}"
+        data_hash = _training_data_hash(texts, labels)
+        model_version = f"bot_{self.bot_id}_{data_hash}"
+        
+        # Unchanged training data: reuse the saved model instead of retraining
+        cached_metrics = self._load_training_meta()
+        if cached_metrics.get("model_version") == model_version and self.load_model():
+            logger.info("Training data unchanged for bot %s, reusing model %s", self.bot_id, model_version)
+            return cached_metrics
+            
+        self.model_version = model_version
         
         # Approach 1: Sentence Transformer Embeddings
         logger.info("Creating sentence embeddings...")
-        embeddings = self.sentence_transformer.encode(texts)
+        embeddings = self.encode_batch(texts)
         
         # Group embeddings by intent
         intent_groups = {}
@@ -71,19 +317,24 @@ class IntentClassifier:
         self.intent_embeddings = {}
         for intent_name, intent_embeddings in intent_groups.items():
             self.intent_embeddings[intent_name] = np.mean(intent_embeddings, axis=0)
+        self._build_intent_matrix()
             
-        # Approach 2: TF-IDF + Random Forest
-        logger.info("Training TF-IDF + Random Forest classifier...")
-        self.tfidf_vectorizer = TfidfVectorizer(
-            max_features=5000,
-            ngram_range=(1, 3),
-            stop_words='english'
+        # Approach 2: hashed n-grams + linear classifier (the vectorizer is
+        # stateless, and a prediction is one sparse dot product per intent)
+        logger.info("Training hashed n-gram + SGD classifier...")
+        self.tfidf_vectorizer = HashingVectorizer(
+            n_features=2 ** 18,
+            ngram_range=(1, 2),
+            stop_words='english',
+            lowercase=False,  # texts are normalized before they get here
+            alternate_sign=False,
+            norm='l2'
         )
         
-        tfidf_features = self.tfidf_vectorizer.fit_transform(texts)
+        tfidf_features = self.tfidf_vectorizer.transform(texts)
         
-        self.rf_classifier = RandomForestClassifier(
-            n_estimators=100,
+        self.rf_classifier = SGDClassifier(
+            loss='log_loss',
             random_state=42,
             class_weight='balanced'
         )
@@ -91,11 +342,9 @@ class IntentClassifier:
         
         # Store training data for similarity matching
         self.training_texts = texts
+        self.training_embeddings = _l2_normalize(embeddings)
         self.intent_labels = labels
         
-        # Save model
-        self.save_model()
-        
         # Calculate training metrics
         train_accuracy = self.rf_classifier.score(tfidf_features, labels)
         
@@ -106,65 +355,83 @@ class IntentClassifier:
             "model_version": self.model_version
         }
         
-        logger.info(f"Training completed. Accuracy: {train_accuracy:.3f}")
+        # Save model
+        self.save_model(metrics)
+        
+        logger.info("Training completed. Accuracy: %.3f", train_accuracy)
         return metrics
     
+    def _early_exit(
+        self, classes: np.ndarray, probabilities: np.ndarray, threshold: float
+    ) -> Optional[Tuple[str, float]]:
+        """The classifier's prediction, if decisive enough to skip the encoder"""
+        margin = settings.EARLY_EXIT_MARGIN
+        if margin is None or len(probabilities) < 2:
+            return None
+            
+        second, best = np.argpartition(probabilities, -2)[-2:]
+        confidence = float(probabilities[best])
+        if confidence <= threshold or confidence - probabilities[second] <= margin:
+            return None
+            
+        with _predict_stats_lock:
+            _predict_stats["early_exit"] += 1
+        return classes[best], confidence
+    
     def predict(self, text: str, threshold: float = None) -> Tuple[str, float]:
         """Predict intent using ensemble of approaches"""
         if threshold is None:
             threshold = settings.MIN_CONFIDENCE_THRESHOLD
             
-        text = text.lower().strip()
+        text = _normalize_text(text)
+        with _predict_stats_lock:
+            _predict_stats["total"] += 1
+            total, early_exits = _predict_stats["total"], _predict_stats["early_exit"]
+        if total % 1000 == 0:
+            logger.info(
+                "Intent prediction early-exit rate: %.1f%% of %d",
+                100 * early_exits / total, total
+            )
         
-        # Approach 1: Sentence transformer similarity
-        text_embedding = self.sentence_transformer.encode([text])[0]
-        semantic_scores = {}
+        # Scores are accumulated in one array aligned with self._intent_names
+        final_scores = np.zeros(len(self._intent_names), dtype=np.float32)
         
-        for intent_name, intent_embedding in self.intent_embeddings.items():
-            similarity = cosine_similarity([text_embedding], [intent_embedding])[0][0]
-            semantic_scores[intent_name] = similarity
-            
-        # Approach 2: TF-IDF + Random Forest
+        # Approach 2 first: the n-gram classifier is cheap next to an encode
         if self.tfidf_vectorizer and self.rf_classifier:
             tfidf_features = self.tfidf_vectorizer.transform([text])
             rf_probabilities = self.rf_classifier.predict_proba(tfidf_features)[0]
             rf_classes = self.rf_classifier.classes_
             
-            rf_scores = dict(zip(rf_classes, rf_probabilities))
-        else:
-            rf_scores = {}
+            # Early exit when it is confident by a clear margin
+            early_exit = self._early_exit(rf_classes, rf_probabilities, threshold)
+            if early_exit:
+                return early_exit
+                
+            columns = self._classifier_columns()
+            known = columns >= 0
+            final_scores[columns[known]] += 0.4 * rf_probabilities[known]
+            
+        if not len(final_scores):
+            return None, 0.0
+            
+        # Approach 1: Sentence transformer similarity
+        text_embedding = self.embed(text)
+        final_scores += 0.4 * self._intent_similarities(text_embedding)
             
         # Approach 3: Direct similarity with training examples
-        if self.training_texts:
-            training_embeddings = self.sentence_transformer.encode(self.training_texts)
-            similarities = cosine_similarity([text_embedding], training_embeddings)[0]
+        if self.training_embeddings is not None and len(self.training_embeddings):
+            similarities = self.training_embeddings @ text_embedding
             
             # Find best matching training example
             best_idx = np.argmax(similarities)
-            best_similarity = similarities[best_idx]
-            best_intent = self.intent_labels[best_idx]
-            
-            direct_scores = {best_intent: best_similarity}
-        else:
-            direct_scores = {}
-            
-        # Ensemble: Combine scores with weights
-        final_scores = {}
-        all_intents = set(list(semantic_scores.keys()) + list(rf_scores.keys()) + list(direct_scores.keys()))
-        
-        for intent in all_intents:
-            semantic_score = semantic_scores.get(intent, 0) * 0.4
-            rf_score = rf_scores.get(intent, 0) * 0.4
-            direct_score = direct_scores.get(intent, 0) * 0.2
-            
-            final_scores[intent] = semantic_score + rf_score + direct_score
+            best_intent = self._intent_index.get(self.intent_labels[best_idx])
+            if best_intent is not None:
+                final_scores[best_intent] += 0.2 * similarities[best_idx]
             
         # Get best prediction
-        if not final_scores:
-            return None, 0.0
-            
-        best_intent = max(final_scores, key=final_scores.get)
-        confidence = final_scores[best_intent]
+        best = int(final_scores.argmax())
+        best_intent = self._intent_names[best]
+        confidence = float(final_scores[best])
         
         # Apply threshold
         if confidence < threshold:
@@ -172,41 +439,171 @@ class IntentClassifier:
             
         return best_intent, confidence
     
-    def save_model(self):
-        """Save the trained model to disk"""
-        model_dir = os.path.join(settings.MODELS_DIR, f"bot_{self.bot_id}")
-        os.makedirs(model_dir, exist_ok=True)
+    @staticmethod
+    def model_dir(bot_id: int) -> str:
+        """Directory holding the trained model artifacts for a bot"""
+        return os.path.join(settings.MODELS_DIR, f"bot_{bot_id}")
+    
+    @classmethod
+    def active_model_dir(cls, bot_id: int) -> str:
+        """
+        Directory of the bot's current model version.
+        
+        Each save writes a complete new version directory and then swaps the
+        CURRENT pointer to it, so a load sees one whole model, never a mix
+        of two. Models saved before versioning live in model_dir itself.
+        """
+        model_dir = cls.model_dir(bot_id)
+        try:
+            with open(os.path.join(model_dir, _CURRENT_VERSION_FILE)) as f:
+                return os.path.join(model_dir, f.read().strip())
+        except FileNotFoundError:
+            return model_dir
+    
+    @classmethod
+    def model_exists(cls, bot_id: int) -> bool:
+        """Check whether a trained model is on disk without loading it"""
+        model_dir = cls.active_model_dir(bot_id)
+        return (
+            os.path.exists(os.path.join(model_dir, 'model_meta.json')) or
+            os.path.exists(os.path.join(model_dir, 'intent_classifier.pkl'))
+        )
+    
+    def _load_training_meta(self) -> Dict:
+        """Metrics recorded by the last training run, if a model is on disk"""
+        meta_path = os.path.join(self.active_model_dir(self.bot_id), 'training_meta.json')
+        if not os.path.exists(meta_path):
+            return {}
+            
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Unreadable training metadata for bot %s: %s", self.bot_id, e)
+            return {}
+    
+    def save_model(self, metrics: Optional[Dict] = None):
+        """
+        Save the trained model to disk.
+        
+        Every artifact goes into a fresh version directory that no reader
+        knows about yet; the CURRENT pointer is then replaced atomically, so
+        concurrent loads in other workers see either the old model or the
+        new one in full.
+        """
+        model_dir = self.model_dir(self.bot_id)
+        version = f"v{time.time_ns()}_{os.getpid()}"
+        version_dir = os.path.join(model_dir, version)
+        os.makedirs(version_dir)
         
-        model_data = {
-            'intent_embeddings': self.intent_embeddings,
+        # Embeddings go to .npy files so loads can memory-map them
+        intent_names = list(self.intent_embeddings)
+        np.save(
+            os.path.join(version_dir, 'intent_embeddings.npy'),
+            np.stack([self.intent_embeddings[name] for name in intent_names]).astype(np.float32)
+        )
+        np.save(os.path.join(version_dir, 'training_embeddings.npy'), self.training_embeddings)
+        if self._intent_matrix_q is not None:
+            np.save(os.path.join(version_dir, 'intent_embeddings_q.npy'), self._intent_matrix_q)
+            np.save(os.path.join(version_dir, 'intent_scales.npy'), self._intent_scale)
+        
+        if self.tfidf_vectorizer:
+            joblib.dump(self.tfidf_vectorizer, os.path.join(version_dir, 'tfidf_vectorizer.pkl'))
+            
+        if self.rf_classifier:
+            joblib.dump(self.rf_classifier, os.path.join(version_dir, 'rf_classifier.pkl'))
+            
+        model_meta = {
+            'intent_names': intent_names,
             'training_texts': self.training_texts,
             'intent_labels': self.intent_labels,
             'model_version': self.model_version
         }
-        
-        with open(os.path.join(model_dir, 'intent_classifier.pkl'), 'wb') as f:
-            pickle.dump(model_data, f)
+        with open(os.path.join(version_dir, 'model_meta.json'), 'w') as f:
+            json.dump(model_meta, f)
             
-        if self.tfidf_vectorizer:
-            joblib.dump(self.tfidf_vectorizer, os.path.join(model_dir, 'tfidf_vectorizer.pkl'))
+        if metrics is not None:
+            with open(os.path.join(version_dir, 'training_meta.json'), 'w') as f:
+                json.dump(metrics, f)
+        
+        # Publish: the rename is the single point where the new model appears
+        pointer_path = os.path.join(model_dir, _CURRENT_VERSION_FILE)
+        tmp_path = f"{pointer_path}.{version}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, pointer_path)
+        
+        self._prune_versions(model_dir, version)
+        logger.info("Model saved for bot %s as %s", self.bot_id, version)
+    
+    @staticmethod
+    def _prune_versions(model_dir: str, current: str):
+        """Remove version directories older than the last _KEPT_VERSIONS"""
+        versions = sorted(
+            (name for name in os.listdir(model_dir)
+             if name.startswith('v') and name[1:].split('_')[0].isdigit()
+             and os.path.isdir(os.path.join(model_dir, name))),
+            key=lambda name: int(name[1:].split('_')[0])
+        )
+        for name in versions[:-_KEPT_VERSIONS]:
+            if name != current:
+                shutil.rmtree(os.path.join(model_dir, name), ignore_errors=True)
+    
+    def _load_arrays(self, model_dir: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Load a model saved as .npy embeddings plus JSON metadata.
+        
+        Returns the saved int8 intent matrix and row scales when quantized
+        scoring is enabled and the model was trained with it, else None.
+        """
+        with open(os.path.join(model_dir, 'model_meta.json')) as f:
+            model_meta = json.load(f)
             
-        if self.rf_classifier:
-            joblib.dump(self.rf_classifier, os.path.join(model_dir, 'rf_classifier.pkl'))
+        # Memory-mapped: pages are read on demand and shared through the page cache
+        intent_matrix = np.load(os.path.join(model_dir, 'intent_embeddings.npy'), mmap_mode='r')
+        self.intent_embeddings = dict(zip(model_meta['intent_names'], intent_matrix))
+        self.training_embeddings = np.load(
+            os.path.join(model_dir, 'training_embeddings.npy'), mmap_mode='r'
+        )
+        self.training_texts = model_meta['training_texts']
+        self.intent_labels = model_meta['intent_labels']
+        self.model_version = model_meta['model_version']
+        
+        q_path = os.path.join(model_dir, 'intent_embeddings_q.npy')
+        if settings.QUANTIZE_EMBEDDINGS and os.path.exists(q_path):
+            return (
+                np.load(q_path, mmap_mode='r'),
+                np.load(os.path.join(model_dir, 'intent_scales.npy'))
+            )
+        return None
+    
+    def _load_pickle(self, model_dir: str):
+        """Load a model saved by earlier versions as a single pickle"""
+        with open(os.path.join(model_dir, 'intent_classifier.pkl'), 'rb') as f:
+            model_data = pickle.load(f)
             
-        logger.info(f"Model saved for bot {self.bot_id}")
+        self.intent_embeddings = model_data['intent_embeddings']
+        self.training_texts = model_data['training_texts']
+        self.intent_labels = model_data['intent_labels']
+        self.model_version = model_data['model_version']
+        
+        self.training_embeddings = model_data.get('training_embeddings')
+        if self.training_embeddings is None and self.training_texts:
+            # Models saved before embeddings were persisted: encode once here
+            self.training_embeddings = self.encode_batch(self.training_texts)
     
     def load_model(self) -> bool:
         """Load a trained model from disk"""
-        model_dir = os.path.join(settings.MODELS_DIR, f"bot_{self.bot_id}")
+        # Resolve the version once; every artifact is read from that directory
+        model_dir = self.active_model_dir(self.bot_id)
         
         try:
-            with open(os.path.join(model_dir, 'intent_classifier.pkl'), 'rb') as f:
-                model_data = pickle.load(f)
-                
-            self.intent_embeddings = model_data['intent_embeddings']
-            self.training_texts = model_data['training_texts']
-            self.intent_labels = model_data['intent_labels']
-            self.model_version = model_data['model_version']
+            quantized = None
+            if os.path.exists(os.path.join(model_dir, 'model_meta.json')):
+                quantized = self._load_arrays(model_dir)
+            else:
+                self._load_pickle(model_dir)
+            self._build_intent_matrix(quantized)
             
             tfidf_path = os.path.join(model_dir, 'tfidf_vectorizer.pkl')
             if os.path.exists(tfidf_path):
@@ -216,23 +613,27 @@ class IntentClassifier:
             if os.path.exists(rf_path):
                 self.rf_classifier = joblib.load(rf_path)
                 
-            logger.info(f"Model loaded for bot {self.bot_id}, version {self.model_version}")
+            logger.info("Model loaded for bot %s, version %s", self.bot_id, self.model_version)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to load model for bot {self.bot_id}: {e}")
+            logger.error("Failed to load model for bot %s: %s", self.bot_id, e)
             return False
     
     def get_intent_suggestions(self, text: str, top_k: int = 5) -> List[Tuple[str, float]]:
         """Get top-k intent suggestions with confidence scores"""
-        text = text.lower().strip()
-        text_embedding = self.sentence_transformer.encode([text])[0]
+        text = _normalize_text(text)
+        text_embedding = self.embed(text)
         
-        scores = []
-        for intent_name, intent_embedding in self.intent_embeddings.items():
-            similarity = cosine_similarity([text_embedding], [intent_embedding])[0][0]
-            scores.append((intent_name, similarity))
+        similarities = self._intent_similarities(text_embedding)
+        if not len(similarities) or top_k <= 0:
+            return []
             
-        # Sort by confidence and return top-k
-        scores.sort(key=lambda x: x[1], reverse=True)
-        return scores[:top_k]
\ No newline at end of file
+        # Select the top-k without sorting every intent, then order them
+        if top_k < len(similarities):
+            top_idx = np.argpartition(-similarities, top_k - 1)[:top_k]
+        else:
+            top_idx = np.arange(len(similarities))
+        top_idx = top_idx[np.argsort(-similarities[top_idx])]
+        
+        return [(self._intent_names[i], float(similarities[i])) for i in top_idx]
\ No newline at end of file
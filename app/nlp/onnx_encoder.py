@@ -0,0 +1,148 @@
+"""Sentence encoder served through ONNX Runtime with int8 dynamic quantization"""
+import fcntl
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, List
+
+import numpy as np
+from app.core.config import settings
+import logging
+
+try:
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from optimum.exporters.onnx import main_export
+    from transformers import AutoTokenizer
+except ImportError:  # optional; callers fall back to SentenceTransformer
+    ort = None
+
+logger = logging.getLogger(__name__)
+
+
+def onnx_available() -> bool:
+    return ort is not None
+
+
+class OnnxSentenceEncoder:
+    """
+    Drop-in for SentenceTransformer.encode backed by an exported ONNX graph.
+    
+    The model is exported and quantized once into MODELS_DIR/onnx and reused
+    afterwards. Embeddings are mean-pooled over the attention mask, matching
+    the pooling of the default all-MiniLM-L6-v2 model.
+    """
+    
+    def __init__(self, model_name: str, max_length: int = 256):
+        self.model_name = model_name
+        self.max_length = max_length
+        
+        export_dir = os.path.join(settings.MODELS_DIR, "onnx", model_name.replace("/", "__"))
+        model_path = self._ensure_exported(export_dir)
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        
+    def _ensure_exported(self, export_dir: str) -> str:
+        """
+        Export and quantize the model once across all worker processes.
+        
+        Workers serialize on a file lock next to the export; the first one
+        builds the export in a temporary directory and renames it into
+        place, so the others never load a half-written graph.
+        """
+        quantized_path = os.path.join(export_dir, "model_quantized.onnx")
+        if os.path.exists(quantized_path):
+            return quantized_path
+            
+        parent_dir = os.path.dirname(export_dir)
+        os.makedirs(parent_dir, exist_ok=True)
+        
+        with open(f"{export_dir}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Another worker may have finished the export while we waited
+                if os.path.exists(quantized_path):
+                    return quantized_path
+                    
+                # Short names resolve to the sentence-transformers organization on the hub
+                model_id = self.model_name if "/" in self.model_name else f"sentence-transformers/{self.model_name}"
+                
+                logger.info("Exporting %s to ONNX in %s", model_id, export_dir)
+                tmp_dir = tempfile.mkdtemp(dir=parent_dir, prefix=".export-")
+                try:
+                    main_export(model_id, output=tmp_dir, task="feature-extraction")
+                    quantize_dynamic(
+                        os.path.join(tmp_dir, "model.onnx"),
+                        os.path.join(tmp_dir, "model_quantized.onnx"),
+                        weight_type=QuantType.QInt8
+                    )
+                    # Leftovers of an export interrupted before this lock existed
+                    shutil.rmtree(export_dir, ignore_errors=True)
+                    os.replace(tmp_dir, export_dir)
+                except Exception:
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                    raise
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                
+        return quantized_path
+    
+    def encode(
+        self,
+        sentences: List[str],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+        **kwargs
+    ) -> np.ndarray:
+        """Encode sentences into an (n, dim) float32 array"""
+        batches = []
+        
+        for i in range(0, len(sentences), batch_size):
+            encoded = self.tokenizer(
+                sentences[i:i + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np"
+            )
+            feeds: Dict[str, np.ndarray] = {
+                name: values.astype(np.int64)
+                for name, values in encoded.items() if name in self.input_names
+            }
+            token_embeddings = self.session.run(None, feeds)[0]
+            
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            batches.append(
+                (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            )
+            
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+            
+        embeddings = np.concatenate(batches).astype(np.float32)
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.clip(norms, 1e-12, None)
+        return embeddings
+
+
+_encoders: Dict[str, OnnxSentenceEncoder] = {}
+_encoders_lock = threading.Lock()
+
+
+def get_onnx_encoder(model_name: str) -> OnnxSentenceEncoder:
+    """Process-wide ONNX encoder per model, exported on first use"""
+    with _encoders_lock:
+        encoder = _encoders.get(model_name)
+        if encoder is None:
+            encoder = OnnxSentenceEncoder(model_name)
+            _encoders[model_name] = encoder
+        return encoder
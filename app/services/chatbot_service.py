@@ -1,12 +1,22 @@
+import re
 import time
 import uuid
 import random
-from typing import Dict, List, Optional, Any, Tuple
-from sqlalchemy.orm import Session
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Tuple, Union
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, inspect, literal, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.models.database import SessionLocal
 from app.models.models import (
     Bot, Intent, Entity, Conversation, Message, Response, 
-    ConversationStatus, BotStatus
+    ConversationStatus, BotStatus, TrainingJob, Organization
 )
+from app.api.cache import invalidate_cached_responses
 from app.nlp.intent_classifier import IntentClassifier
 from app.nlp.entity_extractor import EntityExtractor
 from app.core.config import settings
@@ -15,6 +25,191 @@ import json
 
 logger = logging.getLogger(__name__)
 
+# Runs entity extraction alongside intent classification; spaCy, numpy and
+# torch release the GIL for most of their work
+_nlp_executor = ThreadPoolExecutor(
+    max_workers=settings.NLP_EXECUTOR_WORKERS, thread_name_prefix="nlp"
+)
+
+
+def _load_training_intents(db: Session, bot_id: int) -> List[Intent]:
+    """Load active intents that have training phrases, phrases included"""
+    intents = db.query(Intent).options(
+        selectinload(Intent.training_phrases)
+    ).filter(
+        Intent.bot_id == bot_id,
+        Intent.is_active == True
+    ).all()
+    
+    # Filter intents that have training phrases
+    intents_with_data = [
+        intent for intent in intents 
+        if intent.training_phrases and len(intent.training_phrases) > 0
+    ]
+    
+    if not intents_with_data:
+        raise ValueError("No training data available")
+    
+    return intents_with_data
+
+
+# {name} (entity, else context variable), {@name} (entity), {$name} (variable)
+_PLACEHOLDER_RE = re.compile(r"\{([@$]?)([^{}]+)\}")
+
+# A template as (literal, sigil, name) segments, the last without a
+# placeholder; a template with no placeholders stays a plain string
+CompiledTemplate = Union[str, Tuple[Tuple[str, Optional[str], Optional[str]], ...]]
+
+
+def _compile_template(template: str) -> CompiledTemplate:
+    """Split a response template around its placeholders, once per load"""
+    if '{' not in template:
+        # Renders to itself whatever the entities and context
+        return template
+    segments = []
+    pos = 0
+    for match in _PLACEHOLDER_RE.finditer(template):
+        segments.append((template[pos:match.start()], match.group(1), match.group(2)))
+        pos = match.end()
+    segments.append((template[pos:], None, None))
+    return tuple(segments)
+
+
+def _render_template(
+    template: CompiledTemplate,
+    entity_values: Dict[str, Any],
+    variables: Dict[str, Any]
+) -> str:
+    """Fill a compiled template in one pass; unknown placeholders are kept as-is"""
+    if isinstance(template, str):
+        return template
+    parts = []
+    for literal, sigil, name in template:
+        parts.append(literal)
+        if name is None:
+            continue
+        if sigil != '$' and name in entity_values:
+            parts.append(str(entity_values[name]))
+        elif sigil != '@' and name in variables:
+            parts.append(str(variables[name]))
+        else:
+            parts.append(f"{{{sigil}{name}}}")
+    return ''.join(parts)
+
+
+# Intent name -> compiled text responses of each active intent
+BotResponses = Dict[str, Tuple[CompiledTemplate, ...]]
+
+# bot_id -> (expires_at, BotResponses), shared by every request in the process
+_bot_responses: Dict[int, Tuple[float, BotResponses]] = {}
+_bot_responses_lock = threading.Lock()
+
+
+def _load_bot_responses(db: Session, bot_id: int) -> BotResponses:
+    """
+    Compiled intent responses of a bot, cached per process for BOT_CONFIG_TTL.
+    
+    Writes that change them call invalidate_bot_config; other worker
+    processes pick the change up when their entry expires. Bot settings and
+    status are not cached: the chat path reads them from the bot row loaded
+    by the request's access check.
+    """
+    now = time.monotonic()
+    cached = _bot_responses.get(bot_id)
+    if cached and cached[0] > now:
+        return cached[1]
+        
+    intents = db.query(Intent).options(
+        selectinload(Intent.responses)
+    ).filter(
+        Intent.bot_id == bot_id,
+        Intent.is_active == True
+    ).all()
+    
+    responses = {
+        intent.name: tuple(
+            _compile_template(r.text) for r in intent.responses if r.response_type == 'text'
+        )
+        for intent in intents
+    }
+    
+    with _bot_responses_lock:
+        _bot_responses[bot_id] = (now + settings.BOT_CONFIG_TTL, responses)
+    return responses
+
+
+@dataclass(frozen=True)
+class BotAssets:
+    """A bot's loaded NLP components, shared read-only by concurrent requests"""
+    intent_classifier: IntentClassifier
+    entity_extractor: EntityExtractor
+
+
+# bot_id -> (expires_at, BotAssets), shared by every request in the process
+_bot_assets: Dict[int, Tuple[float, BotAssets]] = {}
+_bot_assets_lock = threading.Lock()
+
+
+def _load_bot_assets(db: Session, bot_id: int) -> BotAssets:
+    """
+    Trained model and entities of a bot, loaded once per process and reused
+    for BOT_ASSETS_TTL.
+    
+    Training in this process drops the entry through invalidate_bot_config;
+    other worker processes reload when their entry expires.
+    """
+    now = time.monotonic()
+    cached = _bot_assets.get(bot_id)
+    if cached and cached[0] > now:
+        return cached[1]
+        
+    intent_classifier = IntentClassifier(bot_id)
+    if not intent_classifier.load_model():
+        logger.warning("No trained model found for bot %s. Training may be required.", bot_id)
+        
+    entities = db.query(Entity).filter(
+        Entity.bot_id == bot_id,
+        Entity.is_active == True
+    ).all()
+    entity_extractor = EntityExtractor(bot_id)
+    entity_extractor.load_entities(entities)
+    
+    assets = BotAssets(intent_classifier=intent_classifier, entity_extractor=entity_extractor)
+    with _bot_assets_lock:
+        _bot_assets[bot_id] = (now + settings.BOT_ASSETS_TTL, assets)
+    return assets
+
+
+# Whether the unique index the conversation upsert's ON CONFLICT needs
+# exists; checked once per process (restart after running the migration)
+_conversation_upsert: Optional[bool] = None
+
+
+def _conversation_upsert_available(db: Session) -> bool:
+    """True once uq_conversation_active_session (Alembic revision 0006) exists"""
+    global _conversation_upsert
+    if _conversation_upsert is None:
+        _conversation_upsert = db.scalar(
+            select(func.to_regclass('uq_conversation_active_session').isnot(None))
+        )
+        if not _conversation_upsert:
+            logger.warning(
+                "Index uq_conversation_active_session is missing; run 'alembic upgrade head'. "
+                "Falling back to SELECT-then-INSERT for conversations."
+            )
+    return _conversation_upsert
+
+
+def invalidate_bot_config(bot_id: int):
+    """
+    Drop a bot's cached responses and NLP assets (call after bot, intent,
+    response or training changes)
+    """
+    with _bot_responses_lock:
+        _bot_responses.pop(bot_id, None)
+    with _bot_assets_lock:
+        _bot_assets.pop(bot_id, None)
+
 
 class ChatbotResponse:
     """Structured chatbot response"""
@@ -55,19 +250,30 @@ class ChatbotResponse:
         }
 
 
+HISTORY_LIMIT = 10
+
+
 class ConversationContext:
     """Manages conversation context and variables"""
     
     def __init__(self, context_data: Dict = None):
         self.data = context_data or {}
         self.variables = self.data.get('variables', {})
-        self.history = self.data.get('history', [])
+        # Bounded so appends drop the oldest turn in place; only the last
+        # 10 items are kept to prevent context from growing too large
+        self.history = deque(self.data.get('history', []), maxlen=HISTORY_LIMIT)
         self.current_flow = self.data.get('current_flow', None)
+        # What changed since load, so the stored context can be patched
+        # instead of rewritten; None once the whole context is replaced
+        self._dirty_variables = set()
+        self._history_dirty = False
         
     def set_variable(self, key: str, value: Any):
         """Set a context variable"""
         self.variables[key] = value
         self.data['variables'] = self.variables
+        if self._dirty_variables is not None:
+            self._dirty_variables.add(key)
         
     def get_variable(self, key: str, default: Any = None) -> Any:
         """Get a context variable"""
@@ -76,58 +282,67 @@ class ConversationContext:
     def add_to_history(self, item: Dict):
         """Add item to conversation history"""
         self.history.append(item)
-        # Keep only last 10 items to prevent context from growing too large
-        self.history = self.history[-10:]
-        self.data['history'] = self.history
+        self._history_dirty = True
         
     def clear(self):
         """Clear conversation context"""
         self.data = {'variables': {}, 'history': [], 'current_flow': None}
         self.variables = {}
-        self.history = []
+        self.history = deque(maxlen=HISTORY_LIMIT)
         self.current_flow = None
+        self._dirty_variables = None
+        
+    def replaced(self):
+        """Mark the whole context as new, e.g. when built from an override"""
+        self._dirty_variables = None
+        
+    def changes(self) -> Optional[Dict]:
+        """
+        Top-level keys changed since load, with 'variables' holding only the
+        changed variables; None if the context must be written in full
+        """
+        if self._dirty_variables is None:
+            return None
+        changes = {}
+        if self._dirty_variables:
+            changes['variables'] = {key: self.variables[key] for key in self._dirty_variables}
+        if self._history_dirty:
+            changes['history'] = list(self.history)
+        return changes
         
     def to_dict(self) -> Dict:
+        # history is stored as a plain list of turns; callers may pass it
+        # back in as context_override
+        self.data['history'] = list(self.history)
         return self.data
 
 
 class ChatbotService:
     """Main chatbot service orchestrating all components"""
     
-    def __init__(self, bot_id: int, db: Session):
-        self.bot_id = bot_id
+    def __init__(self, bot: Bot, db: Session):
+        self.bot = bot
+        self.bot_id = bot.id
         self.db = db
-        self.bot = None
+        self.responses = None
         self.intent_classifier = None
         self.entity_extractor = None
         self._load_bot()
         
     def _load_bot(self):
-        """Load bot configuration and initialize components"""
-        self.bot = self.db.query(Bot).filter(Bot.id == self.bot_id).first()
-        
-        if not self.bot:
-            raise ValueError(f"Bot with ID {self.bot_id} not found")
-            
+        """Check the bot is active and initialize components"""
+        # Status comes from the request's own bot row, never from a cache
         if self.bot.status != BotStatus.ACTIVE:
             raise ValueError(f"Bot {self.bot_id} is not active")
             
-        # Initialize NLP components
-        self.intent_classifier = IntentClassifier(self.bot_id)
-        self.entity_extractor = EntityExtractor(self.bot_id)
+        self.responses = _load_bot_responses(self.db, self.bot_id)
         
-        # Load trained models if available
-        if not self.intent_classifier.load_model():
-            logger.warning(f"No trained model found for bot {self.bot_id}. Training may be required.")
-            
-        # Load entities
-        entities = self.db.query(Entity).filter(
-            Entity.bot_id == self.bot_id,
-            Entity.is_active == True
-        ).all()
-        self.entity_extractor.load_entities(entities)
+        # NLP components, loaded once per process and shared across requests
+        assets = _load_bot_assets(self.db, self.bot_id)
+        self.intent_classifier = assets.intent_classifier
+        self.entity_extractor = assets.entity_extractor
         
-        logger.info(f"Chatbot service initialized for bot {self.bot_id}")
+        logger.info("Chatbot service initialized for bot %s", self.bot_id)
         
     def process_message(
         self,
@@ -140,20 +355,26 @@ class ChatbotService:
         start_time = time.time()
         
         try:
+            # Classify intent on the NLP pool while this thread does the
+            # conversation round-trip and entity extraction; none of them
+            # depend on each other. The session stays on this thread.
+            intent_future = _nlp_executor.submit(
+                self.intent_classifier.predict,
+                message,
+                threshold=self.bot.confidence_threshold
+            )
+            
             # Get or create conversation
             conversation = self._get_or_create_conversation(session_id, user_id)
             
             # Load conversation context
             context = ConversationContext(context_override or conversation.context)
+            if context_override:
+                context.replaced()
             
             # Extract entities
             entities = self.entity_extractor.extract(message)
-            
-            # Classify intent
-            intent_name, confidence = self.intent_classifier.predict(
-                message, 
-                threshold=self.bot.confidence_threshold
-            )
+            intent_name, confidence = intent_future.result()
             
             # Generate response
             response_text = self._generate_response(
@@ -176,14 +397,13 @@ class ChatbotService:
             # Calculate response time
             response_time_ms = int((time.time() - start_time) * 1000)
             
-            # Save message to database
+            # Update conversation context and save the message; both are
+            # written by the single flush of this commit
+            self._update_context(conversation, context)
             self._save_message(
                 conversation, message, response_text, intent_name, 
                 confidence, entities, response_time_ms
             )
-            
-            # Update conversation context
-            conversation.context = context.to_dict()
             self.db.commit()
             
             # Generate suggestions for unclear intents
@@ -203,7 +423,7 @@ class ChatbotService:
             )
             
         except Exception as e:
-            logger.error(f"Error processing message for bot {self.bot_id}: {e}")
+            logger.error("Error processing message for bot %s: %s", self.bot_id, e)
             response_time_ms = int((time.time() - start_time) * 1000)
             
             return ChatbotResponse(
@@ -212,25 +432,79 @@ class ChatbotService:
                 session_id=session_id
             )
     
-    def _get_or_create_conversation(self, session_id: str, user_id: str = None) -> Conversation:
-        """Get existing conversation or create new one"""
-        conversation = self.db.query(Conversation).filter(
-            Conversation.session_id == session_id,
-            Conversation.bot_id == self.bot_id,
-            Conversation.status == ConversationStatus.ACTIVE
-        ).first()
+    def _update_context(self, conversation: Conversation, context: ConversationContext):
+        """
+        Write the turn's context changes to the conversation row.
         
-        if not conversation:
-            conversation = Conversation(
-                session_id=session_id,
-                bot_id=self.bot_id,
-                user_id=user_id,
-                context={}
+        Patches only the changed keys into the stored JSONB, merging changed
+        variables into the existing ones, so the UPDATE carries the delta
+        rather than the whole context.
+        """
+        changes = context.changes()
+        if changes is None or inspect(conversation).pending:
+            # A conversation not yet inserted has no stored context to patch
+            conversation.context = dict(context.to_dict())
+            return
+        if not changes:
+            return
+        
+        patch = Conversation.context
+        variables = changes.pop('variables', None)
+        if changes:
+            patch = patch.op('||', return_type=JSONB)(literal(changes, JSONB))
+        if variables:
+            merged = func.coalesce(
+                Conversation.context['variables'], literal({}, JSONB)
+            ).op('||', return_type=JSONB)(literal(variables, JSONB))
+            patch = patch.op('||', return_type=JSONB)(
+                func.jsonb_build_object('variables', merged, type_=JSONB)
             )
-            self.db.add(conversation)
-            self.db.flush()  # Get the ID
+        conversation.context = patch
+    
+    def _get_or_create_conversation(self, session_id: str, user_id: str = None) -> Conversation:
+        """Get existing conversation or create new one"""
+        if not _conversation_upsert_available(self.db):
+            conversation = self.db.query(Conversation).filter(
+                Conversation.session_id == session_id,
+                Conversation.bot_id == self.bot_id,
+                Conversation.status == ConversationStatus.ACTIVE
+            ).first()
             
-        return conversation
+            if not conversation:
+                conversation = Conversation(
+                    session_id=session_id,
+                    bot_id=self.bot_id,
+                    user_id=user_id,
+                    context={}
+                )
+                # Not flushed here: the INSERT goes out at commit together
+                # with the message and carries the final context
+                self.db.add(conversation)
+                
+            return conversation
+        
+        # Single round-trip upsert: concurrent first messages for a session
+        # race to the same row instead of both inserting. The DO UPDATE is
+        # needed for RETURNING to hand back an existing row; it only fills
+        # in a user_id the conversation was started without.
+        stmt = pg_insert(Conversation).values(
+            session_id=session_id,
+            bot_id=self.bot_id,
+            user_id=user_id,
+            status=ConversationStatus.ACTIVE,
+            context={},
+            meta={}
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Conversation.session_id, Conversation.bot_id],
+            index_where=Conversation.status == ConversationStatus.ACTIVE,
+            set_={"user_id": func.coalesce(Conversation.user_id, stmt.excluded.user_id)}
+        ).returning(Conversation)
+        
+        return self.db.scalars(
+            select(Conversation).from_statement(stmt),
+            execution_options={"populate_existing": True}
+        ).one()
     
     def _generate_response(
         self, 
@@ -244,34 +518,27 @@ class ChatbotService:
         if not intent_name:
             return self.bot.default_response
             
-        # Get intent and its responses
-        intent = self.db.query(Intent).filter(
-            Intent.name == intent_name,
-            Intent.bot_id == self.bot_id,
-            Intent.is_active == True
-        ).first()
-        
-        if not intent or not intent.responses:
-            return self.bot.default_response
-            
-        # Select response (random for now, could be more sophisticated)
-        responses = [r for r in intent.responses if r.response_type == 'text']
+        # Text responses of the intent, from the per-process cache
+        responses = self.responses.get(intent_name)
         if not responses:
             return self.bot.default_response
             
-        selected_response = random.choice(responses)
-        response_text = selected_response.text
+        # Select response (random for now, could be more sophisticated)
+        template = random.choice(responses)
+        if isinstance(template, str):
+            # No placeholders: skip building the entity lookup
+            return template
         
         # Process response template with entities and context
         response_text = self._process_response_template(
-            response_text, entities, context
+            template, entities, context
         )
         
         return response_text
     
     def _process_response_template(
         self, 
-        template: str, 
+        template: CompiledTemplate, 
         entities: List[Dict], 
         context: ConversationContext
     ) -> str:
@@ -282,17 +549,7 @@ class ChatbotService:
         for entity in entities:
             entity_values[entity['entity']] = entity['value']
             
-        # Replace entity placeholders
-        for entity_name, value in entity_values.items():
-            template = template.replace(f"{{{entity_name}}}", str(value))
-            template = template.replace(f"{{@{entity_name}}}", str(value))
-            
-        # Replace context variable placeholders
-        for var_name, value in context.variables.items():
-            template = template.replace(f"{{{var_name}}}", str(value))
-            template = template.replace(f"{{${var_name}}}", str(value))
-            
-        return template
+        return _render_template(template, entity_values, context.variables)
     
     def _save_message(
         self,
@@ -305,8 +562,10 @@ class ChatbotService:
         response_time_ms: int
     ):
         """Save message to database"""
+        # Linked through the relationship so a new conversation's id is
+        # assigned at flush time
         message = Message(
-            conversation_id=conversation.id,
+            conversation=conversation,
             user_message=user_message,
             bot_response=bot_response,
             intent_detected=intent_detected,
@@ -339,55 +598,106 @@ class ChatbotService:
             
     def get_conversation_history(self, session_id: str, limit: int = 50) -> List[Dict]:
         """Get conversation history"""
-        conversation = self.db.query(Conversation).filter(
+        conversation_id = select(Conversation.id).where(
             Conversation.session_id == session_id,
             Conversation.bot_id == self.bot_id
-        ).first()
+        ).limit(1).scalar_subquery()
         
-        if not conversation:
-            return []
-            
-        messages = self.db.query(Message).filter(
-            Message.conversation_id == conversation.id
-        ).order_by(Message.created_at.desc()).limit(limit).all()
+        # Newest `limit` messages, put back in chronological order by the
+        # database, in one round-trip with the conversation lookup
+        recent = select(
+            Message.id,
+            Message.user_message,
+            Message.bot_response,
+            Message.intent_detected,
+            Message.confidence_score,
+            Message.entities_extracted,
+            Message.created_at
+        ).where(
+            Message.conversation_id == conversation_id
+        ).order_by(
+            Message.created_at.desc(), Message.id.desc()
+        ).limit(limit).subquery()
+        
+        # Streamed from a server-side cursor in chunks rather than buffered
+        rows = self.db.execute(
+            select(recent).order_by(recent.c.created_at, recent.c.id),
+            execution_options={"yield_per": 100}
+        )
         
         return [
             {
-                'user_message': msg.user_message,
-                'bot_response': msg.bot_response,
-                'intent': msg.intent_detected,
-                'confidence': msg.confidence_score,
-                'entities': msg.entities_extracted,
-                'timestamp': msg.created_at.isoformat()
+                'user_message': row.user_message,
+                'bot_response': row.bot_response,
+                'intent': row.intent_detected,
+                'confidence': row.confidence_score,
+                'entities': row.entities_extracted,
+                'timestamp': row.created_at.isoformat()
             }
-            for msg in reversed(messages)
+            for row in rows
         ]
+
+
+def _invalidate_after_training(db: Session, bot_id: int):
+    """
+    Drop per-process bot caches and the owner's cached GET responses.
     
-    def train_bot(self) -> Dict:
-        """Train or retrain the bot"""
-        logger.info(f"Starting training for bot {self.bot_id}")
-        
-        # Get all active intents with training phrases
-        intents = self.db.query(Intent).filter(
-            Intent.bot_id == self.bot_id,
-            Intent.is_active == True
-        ).all()
-        
-        # Filter intents that have training phrases
-        intents_with_data = [
-            intent for intent in intents 
-            if intent.training_phrases and len(intent.training_phrases) > 0
-        ]
+    The training job runs after its request has returned, so the response
+    cache middleware never sees the status change it commits.
+    """
+    invalidate_bot_config(bot_id)
+    
+    api_key = db.query(Organization.api_key).join(
+        Bot, Bot.organization_id == Organization.id
+    ).filter(Bot.id == bot_id).scalar()
+    if api_key:
+        invalidate_cached_responses(api_key)
+
+
+def run_training_job(bot_id: int, job_id: int):
+    """
+    Train a bot outside the request that queued it.
+    
+    Runs as a background task after the response has been sent, so it uses
+    its own session and records the outcome on the TrainingJob row.
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(TrainingJob).filter(TrainingJob.id == job_id).first()
+        job.status = "running"
+        db.commit()
         
-        if not intents_with_data:
-            raise ValueError("No training data available")
-            
-        # Train the intent classifier
-        metrics = self.intent_classifier.train(intents_with_data)
+        logger.info("Starting training job %s for bot %s", job_id, bot_id)
         
-        # Update bot status
-        self.bot.status = BotStatus.ACTIVE
-        self.db.commit()
+        intents_with_data = _load_training_intents(db, bot_id)
+        metrics = IntentClassifier(bot_id).train(intents_with_data)
+        
+        db.query(Bot).filter(Bot.id == bot_id).update(
+            {Bot.status: BotStatus.ACTIVE}, synchronize_session=False
+        )
+        job.status = "completed"
+        job.metrics = metrics
+        job.model_version = metrics.get("model_version")
+        job.completed_at = func.now()
+        db.commit()
+        _invalidate_after_training(db, bot_id)
+        
+        logger.info("Training job %s completed for bot %s", job_id, bot_id)
+        
+    except Exception as e:
+        db.rollback()
+        logger.error("Training job %s failed for bot %s: %s", job_id, bot_id, e)
+        
+        db.query(Bot).filter(Bot.id == bot_id).update(
+            {Bot.status: BotStatus.INACTIVE}, synchronize_session=False
+        )
+        db.query(TrainingJob).filter(TrainingJob.id == job_id).update({
+            TrainingJob.status: "failed",
+            TrainingJob.error_message: str(e),
+            TrainingJob.completed_at: func.now()
+        }, synchronize_session=False)
+        db.commit()
+        _invalidate_after_training(db, bot_id)
         
-        logger.info(f"Training completed for bot {self.bot_id}")
-        return metrics
\ No newline at end of file
+    finally:
+        db.close()
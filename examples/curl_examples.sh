@@ -204,6 +204,16 @@ echo ""
 echo "6. Training bot..."
 TRAINING_RESPONSE=$(api_call POST "/bots/$BOT_ID/train")
 echo "Training response: $TRAINING_RESPONSE"
+TRAINING_ID=$(echo $TRAINING_RESPONSE | jq -r '.training_id')
+
+# Training runs in the background; the bot accepts chat once the job completes
+TRAINING_STATUS="pending"
+while [ "$TRAINING_STATUS" = "pending" ] || [ "$TRAINING_STATUS" = "running" ]; do
+  sleep 2
+  TRAINING_JOB=$(api_call GET "/bots/$BOT_ID/train/$TRAINING_ID")
+  TRAINING_STATUS=$(echo $TRAINING_JOB | jq -r '.status')
+done
+echo "Training job: $TRAINING_JOB"
 echo ""
 
 # 7. Check Bot Status
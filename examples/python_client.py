@@ -6,7 +6,10 @@ using Python. Perfect for building custom applications on top of the platform.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, List
 import time
 
@@ -14,17 +17,27 @@ import time
 class ChatbotClient:
     """Python client for the Chatbot Platform API"""
     
-    def __init__(self, api_base_url: str, api_key: str):
+    def __init__(self, api_base_url: str, api_key: str, pool_maxsize: int = 64):
         """
         Initialize the client
         
         Args:
             api_base_url: Base URL of the API (e.g., 'http://localhost:8000')
             api_key: Your organization's API key
+            pool_maxsize: Keep-alive connections kept per host, so concurrent
+                calls reuse connections instead of reconnecting
         """
         self.api_base_url = api_base_url.rstrip('/')
         self.api_key = api_key
         self.session = requests.Session()
+        # Retries cover idempotent requests only; a POST is never replayed
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.session.headers.update({
             'Authorization': f'Bearer {api_key}',
             'Content-Type': 'application/json'
@@ -84,14 +97,80 @@ class ChatbotClient:
         response.raise_for_status()
         return response.json()
     
+    def create_intents_bulk(self, bot_id: int, intents: List[Dict]) -> List[Dict]:
+        """
+        Create many intents, with their training phrases, in one request
+        
+        Each item has 'name', optional 'description' and 'priority', and a
+        'training_phrases' list of strings.
+        """
+        data = {
+            'bot_id': bot_id,
+            'intents': intents
+        }
+        response = self.session.post(
+            f'{self.api_base_url}/api/v1/bots/{bot_id}/intents/bulk',
+            json=data
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def add_responses_bulk(self, bot_id: int, intent_id: int, texts: List[str]) -> List[Dict]:
+        """Add many responses to an intent in one request"""
+        data = {
+            'responses': [{'text': text} for text in texts]
+        }
+        response = self.session.post(
+            f'{self.api_base_url}/api/v1/bots/{bot_id}/intents/{intent_id}/responses/bulk',
+            json=data
+        )
+        response.raise_for_status()
+        return response.json()
+    
     def train_bot(self, bot_id: int) -> Dict:
-        """Train a bot with its current data"""
+        """Queue training of a bot with its current data (returns the queued job)"""
         response = self.session.post(
             f'{self.api_base_url}/api/v1/bots/{bot_id}/train'
         )
         response.raise_for_status()
         return response.json()
     
+    def get_training_job(self, bot_id: int, training_id: int) -> Dict:
+        """Get the status and metrics of a training job"""
+        response = self.session.get(
+            f'{self.api_base_url}/api/v1/bots/{bot_id}/train/{training_id}'
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def get_bot_status(self, bot_id: int) -> Dict:
+        """Get the current status and health of a bot"""
+        response = self.session.get(
+            f'{self.api_base_url}/api/v1/bots/{bot_id}/status'
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def wait_for_training(self, bot_id: int, training_id: int,
+                          timeout: float = 600, poll_interval: float = 2) -> Dict:
+        """
+        Poll a training job until it is completed or failed
+        
+        Training runs in the background after train_bot returns; the bot
+        only accepts chat messages once its job has completed.
+        
+        Raises:
+            TimeoutError: if the job has not finished within `timeout` seconds
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get_training_job(bot_id, training_id)
+            if job['status'] in ('completed', 'failed'):
+                return job
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Training job {training_id} still {job['status']} after {timeout}s")
+            time.sleep(poll_interval)
+    
     def chat(self, bot_id: int, message: str, session_id: str, 
              user_id: str = None, context: Dict = None) -> Dict:
         """Send a message to the bot and get response"""
@@ -179,27 +258,34 @@ def main():
             }
         ]
         
-        # Create intents and add training data
-        for intent_data in intents_data:
-            print(f"Creating intent: {intent_data['name']}")
-            intent = client.create_intent(
-                bot_id=bot_id,
-                name=intent_data['name'],
-                description=intent_data['description']
-            )
-            intent_id = intent['id']
-            
-            # Add training phrases
-            for phrase in intent_data['training_phrases']:
-                client.add_training_phrase(bot_id, intent_id, phrase)
-            
-            # Add responses
-            for response_text in intent_data['responses']:
-                client.add_response(bot_id, intent_id, response_text)
+        # Create all intents with their training phrases in one request
+        print(f"Creating intents: {', '.join(item['name'] for item in intents_data)}")
+        intents = client.create_intents_bulk(bot_id, [
+            {
+                'name': item['name'],
+                'description': item['description'],
+                'training_phrases': item['training_phrases']
+            }
+            for item in intents_data
+        ])
+        
+        # One request per intent for its responses; intents are independent,
+        # so send them concurrently over the client's pooled connections
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            uploads = [
+                pool.submit(client.add_responses_bulk, bot_id, intent['id'], item['responses'])
+                for intent, item in zip(intents, intents_data)
+            ]
+            for upload in uploads:
+                upload.result()
         
         # Train the bot
         print("Training bot...")
-        training_result = client.train_bot(bot_id)
+        queued = client.train_bot(bot_id)
+        training_result = client.wait_for_training(bot_id, queued['training_id'])
+        if training_result['status'] == 'failed':
+            print(f"Training failed: {training_result['message']}")
+            return
         print(f"Training completed: {training_result['message']}")
         print(f"Training metrics: {training_result['metrics']}")
         